@@ -48,47 +48,78 @@ import traceback
 from PyLieDB import PyLieDB
 from ModelsClass import Model
 from RGEsModule import RGEsModule
+from Cache import ResultsCache, Checkpoint
 
 t0 = time.time()
 
+# The RGEs may have already been computed for this model
+cache = ResultsCache(runSettings, yamlSettings)
+
 # Create the interactive database instance
 idb = PyLieDB(raiseErrors=True)
 
-error = False
-# Whatever happens (errors or not) the DB is properly closed
-try:
-    idb.load()
+# The model may have already been initialized in a previous run
+snapshot = cache.loadSnapshot(idb)
 
-    # Create the instance of the model
-    model = Model(yamlSettings, runSettings, idb)
+if snapshot is not None:
+    model, RGmodule = snapshot
+    if not model.restoreSnapshot(runSettings, RGmodule):
+        snapshot = None
 
-    # Create the instance of the RG module
-    RGmodule = RGEsModule(model)
+if snapshot is None:
+    error = False
+    # Whatever happens (errors or not) the DB is properly closed
+    try:
+        idb.load()
 
-    # Fill the information in RGmodule using the Lagrangian expression
-    model.expandLagrangian(RGmodule)
+        # Create the instance of the model
+        model = Model(yamlSettings, runSettings, idb)
 
-    # Map the model onto the general Lagrangian form
-    model.constructMapping(RGmodule)
+        # Create the instance of the RG module
+        RGmodule = RGEsModule(model)
 
-    # Initialize various gauge and tensor quantities + check gauge invariance
-    RGmodule.initialize()
-except SystemExit:
-    exit()
-except:
-    error = True
-    track = traceback.format_exc()
-finally:
-    idb.close()
-    if error:
-        print(track)
-        exit(1)
-
-
-# Actual beta-function computation
-model.defineBetaFunctions(RGmodule)
-model.computeBetaFunctions()
-model.mapBetaFunctions()
+        # Fill the information in RGmodule using the Lagrangian expression
+        model.expandLagrangian(RGmodule)
+
+        # Map the model onto the general Lagrangian form
+        model.constructMapping(RGmodule)
+
+        # Initialize various gauge and tensor quantities + check gauge invariance
+        RGmodule.initialize()
+    except SystemExit:
+        exit()
+    except:
+        error = True
+        track = traceback.format_exc()
+    finally:
+        idb.close()
+        if error:
+            print(track)
+            exit(1)
+
+    cache.storeSnapshot(model, RGmodule, idb)
+
+
+# Actual beta-function computation, unless the RGEs are found in the cache
+cachedRGEs = cache.load()
+
+if cachedRGEs is None or not model.loadBetaFunctions(cachedRGEs):
+    model.defineBetaFunctions(RGmodule)
+
+    # The lower loop orders may have been computed in a previous run
+    if cachedRGEs is not None:
+        model.reuseLowerLoops(cachedRGEs)
+
+    if runSettings['Incremental']:
+        model.reuseDiagrams(cache.loadLastRun(), RGmodule)
+
+    model.computeBetaFunctions(Checkpoint(runSettings, cache))
+    model.mapBetaFunctions()
+
+    cache.store(model)
+
+    if runSettings['Incremental']:
+        cache.storeLastRun(model.lastRunData(RGmodule))
 
 # Apply the user-defined substitutions (replacements, GUT normalization, ...)
 model.doSubstitutions()
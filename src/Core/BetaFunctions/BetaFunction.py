@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 from sys import exit
+import ast
+import inspect
+import itertools
+import textwrap
+from collections import Counter
 from Logging import loggingCritical
+from Definitions import PolyAccumulator, Tensor, TensorDic
 
 class BetaFunction():
     def __init__(self, model, RGmodule, fieldContent, nLoops):
@@ -13,6 +19,18 @@ class BetaFunction():
 
         self.functions = []
         self.coefficients = []
+        self.symmetries = {}
+        self.cosets = {}
+
+        # Structure of the diagrams, used to skip the structurally vanishing ones
+        self.structures = {}
+        self.nPruned = 0
+
+        # Values of the diagrams re-used from a previous run / recorded
+        # during this one (incremental mode)
+        self.diagramCache = {}
+        self.diagramValues = {}
+        self.recordDiagrams = False
 
         # The BetaFunction object inherits all the useful attributes from RGmodule
         for key in dir(RGmodule) :
@@ -21,6 +39,12 @@ class BetaFunction():
 
         self.fDefinitions()
         self.cDefinitions()
+        self.sDefinitions()
+
+    def sDefinitions(self):
+        """ Symmetries of the diagrams under the permutations of their external
+            indices. By default, the diagrams are assumed to have none """
+        pass
 
 
     def Beta(self, *args, nLoops=1):
@@ -34,22 +58,190 @@ class BetaFunction():
                 return self.storeDic[key]
             storeAfter = True
 
-        ret = 0
+        ret = PolyAccumulator()
         for j, coeff in enumerate(self.coefficients[nLoops]):
             if coeff != 0:
+                if not self.canBeNonZero(self.functions[nLoops][j], args):
+                    self.nPruned += 1
+                    continue
                 try:
-                    tmp = self.functions[nLoops][j](*args)
+                    tmp = self.evaluate(self.functions[nLoops][j], args)
                     if tmp != 0:
-                        if ret == 0:
-                            ret = coeff * tmp
-                        else:
-                            ret += coeff * tmp
+                        ret.add(tmp, coeff)
                 except BaseException as e:
                     loggingCritical(f"## Error while computing {self.functions[nLoops][j].__name__}. ##")
                     loggingCritical('>> ' + str(e))
                     exit()
 
+        ret = ret.toExpr()
+
         if storeAfter:
             self.storeDic[key] = ret
 
-        return ret
\ No newline at end of file
+        return ret
+
+    def cosetRepresentatives(self, name, n):
+        """ Returns one permutation of the n external indices per left coset of
+            the symmetry group of the diagram, together with the order of the group """
+
+        if name not in self.cosets:
+            identity = tuple(range(n))
+            group, new = {identity}, [identity]
+            while new != []:
+                new = [tuple([g[p[i]] for i in range(n)]) for g in new for p in self.symmetries.get(name, [])]
+                new = [g for g in set(new) if g not in group]
+                group.update(new)
+
+            reps, seen = [], set()
+            for sigma in itertools.permutations(range(n)):
+                if sigma not in seen:
+                    reps.append(sigma)
+                    seen.update([tuple([sigma[h[i]] for i in range(n)]) for h in group])
+
+            self.cosets[name] = (reps, len(group))
+
+        return self.cosets[name]
+
+    def symmetrizedBeta(self, *args, nLoops=1):
+        """ Sum of Beta over all the permutations of the external indices.
+            Each diagram is only computed once per orbit of its symmetry group. """
+
+        ret = PolyAccumulator()
+        for j, coeff in enumerate(self.coefficients[nLoops]):
+            if coeff != 0:
+                func = self.functions[nLoops][j]
+                reps, order = self.cosetRepresentatives(func.__name__, len(args))
+                orbit = Counter([tuple([args[i] for i in sigma]) for sigma in reps])
+
+                for perm, mult in orbit.items():
+                    if not self.canBeNonZero(func, perm):
+                        self.nPruned += 1
+                        continue
+                    try:
+                        tmp = self.evaluate(func, perm)
+                        if tmp != 0:
+                            ret.add(tmp, coeff*order*mult)
+                    except BaseException as e:
+                        loggingCritical(f"## Error while computing {func.__name__}. ##")
+                        loggingCritical('>> ' + str(e))
+                        exit()
+
+        return ret
+
+    def evaluate(self, func, args):
+        """ Evaluates a diagram, possibly re-using its value from a previous run """
+
+        key = (func.__name__, tuple(args))
+
+        if key in self.diagramCache:
+            value = self.diagramCache[key]
+        else:
+            value = func(*args)
+
+        if self.recordDiagrams:
+            self.diagramValues[key] = value
+
+        return value
+
+    def parseDiagram(self, func):
+        """ Returns the AST of the definition of a diagram, or None """
+
+        try:
+            return ast.parse(textwrap.dedent(inspect.getsource(func))).body[0]
+        except (OSError, SyntaxError):
+            return None
+
+    def diagramStructure(self, func):
+        """ For a diagram of the form 'return tensorContract(self.T1(...), ...)',
+            returns the list of (tensor, positions, args) where positions are the
+            index positions of the tensor carrying the external indices args.
+            Returns None if the diagram does not have this form. """
+
+        if func.__name__ not in self.structures:
+            self.structures[func.__name__] = None
+
+            funcDef = self.parseDiagram(func)
+            if funcDef is None:
+                return None
+
+            params = [arg.arg for arg in funcDef.args.args[1:]]
+            body = funcDef.body
+
+            if (len(body) != 1 or not isinstance(body[0], ast.Return)
+                or not isinstance(body[0].value, ast.Call)
+                or not isinstance(body[0].value.func, ast.Name)
+                or body[0].value.func.id != 'tensorContract'):
+                return None
+
+            structure = []
+            for call in body[0].value.args:
+                if (not isinstance(call, ast.Call) or not isinstance(call.func, ast.Attribute)
+                    or not isinstance(call.func.value, ast.Name) or call.func.value.id != 'self'):
+                    return None
+
+                tensor = getattr(self, call.func.attr, None)
+                if not isinstance(tensor, Tensor):
+                    return None
+
+                positions, args = [], []
+                for pos, ind in enumerate(call.args):
+                    if not isinstance(ind, ast.Name):
+                        return None
+                    if ind.id in params:
+                        positions.append(pos)
+                        args.append(params.index(ind.id))
+
+                structure.append((tensor, tuple(positions), args))
+
+            self.structures[func.__name__] = structure
+
+        return self.structures[func.__name__]
+
+    def diagramDependencies(self, func, tensorNames):
+        """ Returns the names of the non-lazy tensors the value of a diagram
+            depends on, or None if they cannot be determined. tensorNames maps
+            the id of the tensors to their names. """
+
+        funcDef = self.parseDiagram(func)
+        if funcDef is None:
+            return None
+
+        def expand(dic, deps):
+            if dic.tilde:
+                return expand(dic.tildeRef, deps)
+            return all([addTensor(el[0], deps) for el in dic.args])
+
+        def addTensor(tensor, deps):
+            if isinstance(tensor.dic, TensorDic):
+                return expand(tensor.dic, deps)
+            if id(tensor) not in tensorNames:
+                return False
+            deps.add(tensorNames[id(tensor)])
+            return True
+
+        deps = set()
+        for node in ast.walk(funcDef):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 'self':
+                attr = getattr(self, node.attr, None)
+                if isinstance(attr, Tensor):
+                    if not addTensor(attr, deps):
+                        return None
+                elif node.attr != 'model' and not callable(attr):
+                    return None
+
+        return deps
+
+    def canBeNonZero(self, func, args):
+        """ Returns False if one of the tensors of the diagram has no component
+            compatible with the external indices args """
+
+        structure = self.diagramStructure(func)
+
+        if structure is None:
+            return True
+
+        for tensor, positions, pos in structure:
+            if not tensor.hasComponents(positions, [args[p] for p in pos]):
+                return False
+
+        return True
@@ -4,21 +4,12 @@ from sympy import Rational as r
 from .BetaFunction import BetaFunction
 from Definitions import tensorContract
 
-import itertools
-
 
 class QuarticBetaFunction(BetaFunction):
 
     def compute(self, a,b,c,d, nLoops):
-        perm = list(itertools.permutations([a, b, c, d], 4))
-        permSet = set(perm)
-        coeff = r(len(perm),len(permSet))
-
-        ret = 0
-        for s1,s2,s3,s4 in permSet:
-            ret += coeff * self.Beta(s1,s2,s3,s4, nLoops=nLoops)
-
-        return r(1,24)*ret
+        # Sum over all the permutations of the external indices
+        return self.symmetrizedBeta(a,b,c,d, nLoops=nLoops).toExpr(r(1,24))
 
     def fDefinitions(self):
         """ Functions definition """
@@ -34,6 +25,40 @@ class QuarticBetaFunction(BetaFunction):
                     break
 
 
+    def sDefinitions(self):
+        """ Symmetries of the diagrams under permutations of (a,b,c,d) """
+
+        ab, cd, bc = (1,0,2,3), (0,1,3,2), (0,2,1,3)
+        abcd = (2,3,0,1)
+
+        self.symmetries = {'q1_1': [(1,0,3,2), abcd],
+                           'q1_2': [cd, bc],
+                           'q1_3': [ab, cd, abcd],
+                           'q1_4': [cd, bc],
+
+                           'q2_1': [(1,0,3,2)],
+                           'q2_3': [abcd],
+                           'q2_4': [abcd],
+                           'q2_5': [abcd],
+                           'q2_6': [ab, cd],
+                           'q2_7': [ab, cd],
+                           'q2_8': [ab, cd],
+                           'q2_9': [cd, bc],
+                           'q2_10': [cd, bc],
+                           'q2_11': [cd, bc],
+                           'q2_12': [cd, bc],
+                           'q2_13': [ab, cd],
+                           'q2_14': [ab, cd, abcd],
+                           'q2_15': [cd],
+                           'q2_16': [cd, bc],
+                           'q2_17': [ab, cd],
+                           'q2_18': [ab, cd, abcd],
+                           'q2_21': [cd, bc],
+                           'q2_22': [cd, bc],
+                           'q2_23': [ab, cd, abcd],
+                           'q2_29': [cd, bc],
+                           'q2_30': [cd, bc]}
+
     def cDefinitions(self):
         """ Coefficients definition """
 
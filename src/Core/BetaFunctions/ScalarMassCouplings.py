@@ -4,21 +4,12 @@ from sympy import Rational as r
 from .BetaFunction import BetaFunction
 from Definitions import tensorContract
 
-import itertools
-
 
 class ScalarMassBetaFunction(BetaFunction):
 
     def compute(self, a,b, nLoops):
-        perm = list(itertools.permutations([a, b], 2))
-        permSet = set(perm)
-        coeff = r(len(perm),len(permSet))
-
-        ret = 0
-        for s1,s2 in permSet:
-            ret += coeff * self.Beta(s1,s2, nLoops=nLoops)
-
-        return r(1,2)*ret
+        # Sum over all the permutations of the external indices
+        return self.symmetrizedBeta(a,b, nLoops=nLoops).toExpr(r(1,2))
 
     def fDefinitions(self):
         """ Functions definition """
@@ -34,6 +25,26 @@ class ScalarMassBetaFunction(BetaFunction):
                     break
 
 
+    def sDefinitions(self):
+        """ Symmetries of the diagrams under permutations of (a,b) """
+
+        ab = (1,0)
+
+        self.symmetries = {'m1_2': [ab],
+
+                           'm2_1': [ab],
+                           'm2_2': [ab],
+                           'm2_3': [ab],
+                           'm2_8': [ab],
+                           'm2_9': [ab],
+                           'm2_10': [ab],
+                           'm2_14': [ab],
+                           'm2_15': [ab],
+                           'm2_17': [ab],
+                           'm2_18': [ab],
+                           'm2_22': [ab],
+                           'm2_23': [ab]}
+
     def cDefinitions(self):
         """ Coefficients definition """
 
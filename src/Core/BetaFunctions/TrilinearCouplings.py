@@ -4,21 +4,12 @@ from sympy import Rational as r
 from .BetaFunction import BetaFunction
 from Definitions import tensorContract
 
-import itertools
-
 
 class TrilinearBetaFunction(BetaFunction):
 
     def compute(self, a,b,c, nLoops):
-        perm = list(itertools.permutations([a, b, c], 3))
-        permSet = set(perm)
-        coeff = r(len(perm),len(permSet))
-
-        ret = 0
-        for s1,s2,s3 in permSet:
-            ret += coeff * self.Beta(s1,s2,s3, nLoops=nLoops)
-
-        return r(1,6)*ret
+        # Sum over all the permutations of the external indices
+        return self.symmetrizedBeta(a,b,c, nLoops=nLoops).toExpr(r(1,6))
 
     def fDefinitions(self):
         """ Functions definition """
@@ -34,6 +25,35 @@ class TrilinearBetaFunction(BetaFunction):
                     break
 
 
+    def sDefinitions(self):
+        """ Symmetries of the diagrams under permutations of (a,b,c) """
+
+        ab, bc = (1,0,2), (0,2,1)
+
+        self.symmetries = {'h1_1': [bc],
+                           'h1_2': [ab],
+                           'h1_3': [bc],
+
+                           'h2_1': [ab],
+                           'h2_2': [ab],
+                           'h2_3': [ab],
+                           'h2_4': [bc],
+                           'h2_5': [bc],
+                           'h2_6': [bc],
+                           'h2_7': [bc],
+                           'h2_8': [ab],
+                           'h2_9': [ab],
+                           'h2_10': [bc],
+                           'h2_12': [bc],
+                           'h2_13': [bc],
+                           'h2_14': [ab],
+                           'h2_15': [ab],
+                           'h2_18': [bc],
+                           'h2_19': [bc],
+                           'h2_20': [ab],
+                           'h2_31': [bc],
+                           'h2_32': [bc]}
+
     def cDefinitions(self):
         """ Coefficients definition """
 
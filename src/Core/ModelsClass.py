@@ -4,14 +4,14 @@ import copy
 import re as reg
 import itertools
 
-from sympy import (DiagonalMatrix, Indexed, IndexedBase, Integer, Matrix, Mul, Pow,
+from sympy import (DiagonalMatrix, Indexed, IndexedBase, Integer, Mul, Pow,
                    Rational, SparseMatrix, Symbol, eye, flatten, lambdify, pi,
-                   simplify, sqrt, zeros)
+                   gcd, simplify, sqrt, zeros)
 
 from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication
 
 
-from Logging import loggingInfo, loggingCritical, print_progress
+from Logging import loggingInfo, loggingCritical, loggingDebug, print_progress
 
 from Particles import Particle, ComplexScalar
 
@@ -23,7 +23,9 @@ from BetaFunctions import (GaugeBetaFunction, YukawaBetaFunction, QuarticBetaFun
                            TrilinearBetaFunction, FermionMassBetaFunction, ScalarMassBetaFunction,
                            FermionAnomalous, ScalarAnomalous, VevBetaFunction)
 
-from Definitions import GaugeGroup, Identity, expand
+from Parallel import parallelCompute, parallelRecombine, canRunInParallel
+
+from Definitions import GaugeGroup, Identity, Tensor, TensorDic, expand, subContractions, clearMemos, PolyAccumulator, SparseLU
 
 
 class Model(object):
@@ -45,6 +47,9 @@ class Model(object):
 
         self.loopDic = {}
 
+        Tensor.contractionEngine = runSettings['ContractionEngine']
+        clearMemos()
+
         self.validateSettings(settings, runSettings)
 
         loggingInfo("Loading the model ...", end=' ')
@@ -78,6 +83,7 @@ class Model(object):
         self.allScalars = {}
 
         self.symbolicGen = False
+        self.preloadGroupInfo(settings)
         self.getParticles(settings)
 
         ######################
@@ -171,28 +177,7 @@ class Model(object):
                 self.couplingsPos['Vevs'][k] = i
 
         # Read the beta-factor
-        if 'BetaFactor' in settings:
-            if type(settings['BetaFactor']) not in (list, tuple):
-                self.betaFactor = self.parseMathExpr(settings['BetaFactor'])
-                self.betaExponent = lambda n: 2*n
-            else:
-                self.betaFactor = self.parseMathExpr(settings['BetaFactor'][0])
-                self.betaExponent = self.parseMathExpr(settings['BetaFactor'][1])
-                if self.betaExponent.find('n') == set():
-                    if self.betaExponent == 0:
-                        self.betaExponent = lambda n: 0
-                    else:
-                        loggingCritical("Error : the beta-exponent must be an integer function of 'n'. Setting it to default (2*n).")
-                        self.betaExponent = lambda n: 2*n
-                else:
-                    lambdaExponent = lambdify(Symbol('n'), self.betaExponent)
-                    self.betaExponent = lambda n: lambdaExponent(n)
-            if self.betaFactor == 0:
-                loggingCritical("Error : beta-factor cannot be 0. Exiting.")
-                exit()
-        else:
-            self.betaFactor = Integer(1)
-            self.betaExponent = lambda n: Integer(2)*n
+        self.getBetaFactor(settings)
 
         self.translateContent = {'GaugeCouplings': (0,0),
                                  'Yukawas': (2,1),
@@ -204,15 +189,6 @@ class Model(object):
                                  'ScalarAnomalous': (0,2),
                                  'Vevs': (0,1)}
 
-        self.translateDic = lambda RGmodule: {'Yukawas': RGmodule.YDic,
-                                              'QuarticTerms': RGmodule.LambdaDic,
-                                              'TrilinearTerms' : RGmodule.Hdic,
-                                              'ScalarMasses': RGmodule.MSdic,
-                                              'FermionMasses': RGmodule.MFdic,
-                                              'FermionAnomalous': RGmodule.gammaFdic,
-                                              'ScalarAnomalous': RGmodule.gammaSdic,
-                                              'Vevs': RGmodule.Vdic}
-
         self.translateBetaFunction = {'GaugeCouplings': GaugeBetaFunction,
                                       'Yukawas': YukawaBetaFunction,
                                       'QuarticTerms': QuarticBetaFunction,
@@ -225,6 +201,7 @@ class Model(object):
 
         self.lagrangianMapping = {}
         self.toCalculate = {}
+        self.neededTerms = {}
 
         self.RGclasses = {}
         self.allRGEs = {}
@@ -306,6 +283,11 @@ class Model(object):
         # RUN settings #
         ################
 
+        self.setLoops(runSettings)
+
+    def setLoops(self, runSettings):
+        """ Reads the loop orders of the computation """
+
         if 'Loops' in runSettings:
             maxLoops = {'GaugeCouplings': 3,
                         'Yukawas': 2,
@@ -412,6 +394,28 @@ class Model(object):
         self.gaugeGroupsList = list(self.gaugeGroups.values())
         self.UgaugeGroups = [g for g in self.gaugeGroupsList if g.abelian]
 
+    def preloadGroupInfo(self, settings):
+        """ Reads at once from the DB the info on the representations of the
+            particles, which is then found in the cache of the DB """
+
+        requests = []
+        for key in ('Fermions', 'RealScalars', 'ComplexScalars'):
+            for part, val in settings.get(key, {}).items():
+                qnbs = val['Qnb'] if 'Qnb' in val else val
+                for gName, rep in qnbs.items():
+                    if gName not in self.gaugeGroups or self.gaugeGroups[gName].abelian:
+                        continue
+
+                    gType = self.gaugeGroups[gName].type
+                    if isinstance(rep, list):
+                        rep = tuple(rep)
+                        requests.append(((gType, 'dimR', rep), {}))
+                        requests.append(((gType, 'repMatrices', rep), {'realBasis': GaugeGroup.realBasis}))
+                    elif isinstance(rep, int):
+                        requests.append(((gType, 'dynkinLabels', rep), {'realBasis': GaugeGroup.realBasis}))
+
+        self.idb.preload(requests)
+
     def getParticles(self, settings):
         def completeTrivialReps(dic):
             for k,v in self.gaugeGroups.items():
@@ -664,6 +668,56 @@ class Model(object):
                         self.fermionAnomalous[key] = val
 
 
+    def getBetaFactor(self, settings):
+        if 'BetaFactor' in settings:
+            if type(settings['BetaFactor']) not in (list, tuple):
+                self.betaFactor = self.parseMathExpr(settings['BetaFactor'])
+                self.betaExponent = lambda n: 2*n
+            else:
+                self.betaFactor = self.parseMathExpr(settings['BetaFactor'][0])
+                self.betaExponent = self.parseMathExpr(settings['BetaFactor'][1])
+                if self.betaExponent.find('n') == set():
+                    if self.betaExponent == 0:
+                        self.betaExponent = lambda n: 0
+                    else:
+                        loggingCritical("Error : the beta-exponent must be an integer function of 'n'. Setting it to default (2*n).")
+                        self.betaExponent = lambda n: 2*n
+                else:
+                    lambdaExponent = lambdify(Symbol('n'), self.betaExponent)
+                    self.betaExponent = lambda n: lambdaExponent(n)
+            if self.betaFactor == 0:
+                loggingCritical("Error : beta-factor cannot be 0. Exiting.")
+                exit()
+        else:
+            self.betaFactor = Integer(1)
+            self.betaExponent = lambda n: Integer(2)*n
+
+    def translateDic(self, RGmodule):
+        return {'Yukawas': RGmodule.YDic,
+                'QuarticTerms': RGmodule.LambdaDic,
+                'TrilinearTerms' : RGmodule.Hdic,
+                'ScalarMasses': RGmodule.MSdic,
+                'FermionMasses': RGmodule.MFdic,
+                'FermionAnomalous': RGmodule.gammaFdic,
+                'ScalarAnomalous': RGmodule.gammaSdic,
+                'Vevs': RGmodule.Vdic}
+
+    def __getstate__(self):
+        # The beta-exponent is a lambda function : it is re-built from the
+        # model settings when the model is loaded from a snapshot
+        # The substitutions hold unevaluated expressions (GUT normalization)
+        # which would be evaluated when unpickled : they are re-read in
+        # restoreSnapshot()
+        state = dict(self.__dict__)
+        del state['betaExponent']
+        del state['substitutions']
+        del state['gutNorm']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.getBetaFactor(self.saveSettings)
+
     def parseMathExpr(self, expr, real=False):
         if type(expr) != str:
             expr = Rational(expr)
@@ -749,6 +803,24 @@ class Model(object):
         self.expandedPotential = self.lagrangian.expandedPotential
 
         # Read the substitutions now
+        self.readSubstitutions()
+
+        # VeVs
+        if self.vevs != {}:
+            for k,v in self.vevs.items():
+                RGmodule.Vdic[(v[0],)] = v[1]
+
+        # Anomalous dimensions
+        if self.fermionAnomalous != {}:
+            for k,v in self.fermionAnomalous.items():
+                RGmodule.gammaFdic[v] = k
+
+        if self.scalarAnomalous != {}:
+            for k,v in self.scalarAnomalous.items():
+                RGmodule.gammaSdic[v] = k
+
+
+    def readSubstitutions(self):
         self.substitutions = {}
         self.gutNorm = {}
         if 'Substitutions' in self.saveSettings and self.saveSettings['Substitutions'] != {}:
@@ -776,22 +848,6 @@ class Model(object):
                     cType, diagMat = self.substitutions['yukMat'][k]
                     self.substitutions['yukMat'][k] = (cType, diagMat.arg*Identity(shape[0]))
 
-
-        # VeVs
-        if self.vevs != {}:
-            for k,v in self.vevs.items():
-                RGmodule.Vdic[(v[0],)] = v[1]
-
-        # Anomalous dimensions
-        if self.fermionAnomalous != {}:
-            for k,v in self.fermionAnomalous.items():
-                RGmodule.gammaFdic[v] = k
-
-        if self.scalarAnomalous != {}:
-            for k,v in self.scalarAnomalous.items():
-                RGmodule.gammaSdic[v] = k
-
-
     def doSubstitutions(self):
         loggingInfo("Applying substitutions ...")
         doSubstitutions(self, self.substitutions)
@@ -803,6 +859,18 @@ class Model(object):
     def constructMapping(self, RGmodule):
         loggingInfo("Mapping the model onto the general Lagrangian ...")
 
+        # Check the couplings whose RGEs must be computed. They may be designated
+        # by their name after renaming (see the 'Substitutions' section)
+        self.selection = 'all'
+        if self.runSettings['Couplings'] != 'all':
+            renamed = {str(v[1]): k for k, v in self.substitutions.get('rename', {}).items()}
+            self.selection = [renamed.get(c, c) for c in self.runSettings['Couplings']]
+
+            unknown = [c for c in self.selection if c not in self.allCouplings and c not in self.translateContent]
+            if unknown != []:
+                loggingCritical("Error : unknown coupling(s) in the 'Couplings' setting : " + ', '.join(unknown) + '.')
+                exit()
+
         #Gauge couplings mapping, taking into account possible kinetic mixing
         noMix = {}
         mix = {}
@@ -848,7 +916,7 @@ class Model(object):
         for c in self.gaugeCouplings:
             self.potential[couplingType][c] = 0
 
-        self.lagrangianMapping[couplingType] = gaugeMatrix * self.betaFactor
+        self.lagrangianMapping[couplingType] = SparseMatrix(gaugeMatrix) * self.betaFactor
         self.toCalculate[couplingType] = list(newInds.keys())
 
 
@@ -870,22 +938,28 @@ class Model(object):
                 sortedList = sorted([(key, val) for key, val in translation[couplingType].items() if not(type(key[-1]) == bool and key[-1] == True)],
                                      key=lambda x: (len(set(x[0])), len(x[1].as_coeff_add()[1]), x[0]))
 
-                trys = 0
+                # Fraction-free echelon form of the rows added so far, used
+                # to check the linear independence of each new row
+                echelon = []
                 for el in sortedList:
-                    trys += 1
-                    matTry = self.fillMappingMatrix(mappingMatrix, coeffList, el)
-                    if(matTry.rank() > mappingMatrix.rank()):
-                        mappingMatrix = matTry
+                    row = self.mappingRow(coeffList, el)
+                    remainder = self.reduceRow(row, echelon)
+
+                    if remainder != {}:
+                        for col, val in row.items():
+                            mappingMatrix[len(echelon), col] = val
+                        echelon.append((min(remainder), remainder))
                         dicList.append(el[0])
 
                         count += 1
                         print_progress(count, self.nCouplings, prefix=' '*4, bar_length=20, printTime=self.times, logProgress=True)
 
-                    if matTry.rank() == len(coeffList):
-                        break
+                        if len(echelon) == len(coeffList):
+                            break
 
                 try:
-                    self.lagrangianMapping[couplingType] = Matrix(mappingMatrix).inv() * self.betaFactor
+                    selected = [self.isSelected(couplingType, c) for c in coeffList]
+                    self.lagrangianMapping[couplingType] = self.inverseMapping(mappingMatrix, selected) * self.betaFactor
                 except:
                     # from sympy import pretty
                     loggingCritical("\nError in Lagrangian mapping : matrix of couplings is not invertible.")
@@ -903,7 +977,7 @@ class Model(object):
             self.potential[couplingType] = {}
             for c in self.vevs:
                 self.potential[couplingType][c] = 0
-            self.lagrangianMapping[couplingType] = eye(len(self.vevs))*self.betaFactor
+            self.lagrangianMapping[couplingType] = SparseMatrix(eye(len(self.vevs)))*self.betaFactor
             self.toCalculate[couplingType] = list(RGmodule.Vdic.keys())
 
         if self.fermionAnomalous != {}:
@@ -912,7 +986,7 @@ class Model(object):
             self.potential[couplingType] = {}
             for c in self.fermionAnomalous:
                 self.potential[couplingType][c] = 0
-            self.lagrangianMapping[couplingType] = eye(len(self.fermionAnomalous))
+            self.lagrangianMapping[couplingType] = SparseMatrix(eye(len(self.fermionAnomalous)))
             self.toCalculate[couplingType] = list(RGmodule.gammaFdic.keys())
 
         if self.scalarAnomalous != {}:
@@ -921,26 +995,88 @@ class Model(object):
             self.potential[couplingType] = {}
             for c in self.scalarAnomalous:
                 self.potential[couplingType][c] = 0
-            self.lagrangianMapping[couplingType] = eye(len(self.scalarAnomalous))
+            self.lagrangianMapping[couplingType] = SparseMatrix(eye(len(self.scalarAnomalous)))
             self.toCalculate[couplingType] = list(RGmodule.gammaSdic.keys())
 
+        # Only keep the coupling types for which at least one RGE is computed
+        self.toCalculate = {couplingType: terms for couplingType, terms in self.toCalculate.items()
+                            if any([self.isSelected(couplingType, c) for c in self.potential[couplingType]])}
+
+        if self.toCalculate == {}:
+            loggingCritical("Error : none of the couplings of the model was selected in the 'Couplings' setting.")
+            exit()
+
+    def isSelected(self, couplingType, coupling):
+        """ Whether the RGE of a coupling must be computed (see the 'Couplings' setting) """
+
+        return self.selection == 'all' or couplingType in self.selection or str(coupling) in self.selection
+
+    def inverseMapping(self, mat, selected):
+        """ Inverse of the (sparse) mapping matrix. Only the rows corresponding
+            to the selected couplings are computed, the other ones being set to 0. """
 
-    def fillMappingMatrix(self, mappingMatrix, coeffList, newTerm):
-        newMat = copy.deepcopy(mappingMatrix)
-        j = mappingMatrix.rank()
+        n = mat.shape[0]
 
-        pos = []
+        # Row i of the inverse matrix is the solution of  mat^T x = e_i
+        transposed = {}
+        for i, j, val in mat.row_list():
+            transposed.setdefault(j, {})[i] = val
 
+        lu = SparseLU(transposed, n)
+
+        inv = SparseMatrix(n, n, 0)
+        for i in range(n):
+            if selected[i]:
+                for j, val in lu.solve({i: 1}).items():
+                    inv[i, j] = val
+
+        return inv
+
+    def mappingRow(self, coeffList, newTerm):
+        """ Row of the mapping matrix corresponding to a term of the general
+            Lagrangian, in the form {column: value} """
+
+        row = {}
         for subTerm in newTerm[1].as_coeff_add()[1]:
             splitTerm = flatten(subTerm.as_coeff_mul())
             numeric = [x for x in splitTerm if x.is_number]
             coeff = str([x for x in splitTerm if not x in numeric][0])
-            pos.append((coeffList.index(coeff), Mul(*numeric)))
+            row[coeffList.index(coeff)] = Mul(*numeric)
+
+        return {col: val for col, val in row.items() if val != 0}
 
-        for el in pos:
-            newMat[j, el[0]] = el[1]
+    def reduceRow(self, row, echelon):
+        """ Fraction-free reduction of a row against the echelon form of the
+            previous ones. The remainder is empty iff the row is linearly
+            dependent on them. """
 
-        return newMat
+        row = self.primitiveRow(row)
+        for pivot, pivotRow in echelon:
+            if pivot not in row:
+                continue
+
+            a, b = pivotRow[pivot], row[pivot]
+            newRow = {}
+            for col in set(row) | set(pivotRow):
+                val = expand(a*row.get(col, 0) - b*pivotRow.get(col, 0))
+                if val != 0:
+                    newRow[col] = val
+            row = self.primitiveRow(newRow)
+
+        return row
+
+    def primitiveRow(self, row):
+        """ Divides a row by the (rational) content of its entries, so that their
+            size does not grow with the number of pivots """
+
+        if row == {}:
+            return row
+
+        content = gcd([val.as_content_primitive()[0] for val in row.values()])
+        if content == 1:
+            return row
+
+        return {col: expand(val/content) for col, val in row.items()}
 
 
     ##################
@@ -962,8 +1098,206 @@ class Model(object):
                 self.couplingRGEs[couplingType][i] = {}
                 self.NonZeroCouplingRGEs[couplingType][i] = {}
 
-    def computeBetaFunctions(self):
+            # Only the terms involved in the RGEs of the selected couplings are computed
+            mappingRows = self.mappingRows(couplingType)
+            self.neededTerms[couplingType] = set([j for pos, c in enumerate(self.potential[couplingType]) if self.isSelected(couplingType, c)
+                                                    for j, val in mappingRows.get(pos, [])])
+
+    def mappingRows(self, couplingType):
+        """ Non-zero entries of the mapping matrix, in the form {row: [(column, value)]} """
+
+        rows = {}
+        for i, j, val in self.lagrangianMapping[couplingType].row_list():
+            rows.setdefault(i, []).append((j, val))
+
+        return rows
+
+    def restoreSnapshot(self, runSettings, RGmodule):
+        """ Adapts a model loaded from a snapshot to the current run settings.
+            Returns False if the snapshot cannot be used for this run. """
+
+        snapshotLoops = self.loopDic
+
+        self.runSettings = runSettings
+        self.times = runSettings['PrintComputationTimes']
+
+        Tensor.contractionEngine = runSettings['ContractionEngine']
+        GaugeGroup.realBasis = self.realBasis
+        clearMemos()
+
+        self.loopDic = {}
+        self.setLoops(runSettings)
+
+        self.readSubstitutions()
+
+        # The anomalous dimensions are only read if their loop order is non-zero
+        for k in ('ScalarAnomalous', 'FermionAnomalous'):
+            if self.saveSettings.get(k, {}) != {} and (self.loopDic[k] > 0) != (snapshotLoops[k] > 0):
+                return False
+
+        # The 2-point tensors which are needed depend on the loop orders
+        if self.loopDic != snapshotLoops:
+            RGmodule.initTwoPointTensors()
+
+        return True
+
+    def loadBetaFunctions(self, cachedRGEs):
+        """ Uses the RGEs read from the cache instead of computing them.
+            Returns False if some of the loop orders are missing in the cache. """
+
+        for couplingType, terms in self.toCalculate.items():
+            if (couplingType not in cachedRGEs['terms'] or cachedRGEs['terms'][couplingType] != terms
+                or cachedRGEs['loops'][couplingType] < self.loopDic[couplingType]):
+                return False
+
+        loggingInfo("The RGEs were found in the cache. Skipping the computation.")
+
+        for couplingType in self.toCalculate:
+            nLoops = self.loopDic[couplingType]
+            self.allRGEs[couplingType] = {n: cachedRGEs['allRGEs'][couplingType][n] for n in range(nLoops)}
+            self.couplingRGEs[couplingType] = {n: {c: RGE for c, RGE in cachedRGEs['couplingRGEs'][couplingType][n].items()
+                                                   if self.isSelected(couplingType, c)} for n in range(nLoops)}
+
+            self.NonZeroCouplingRGEs[couplingType] = {}
+            for i in range(nLoops):
+                self.NonZeroCouplingRGEs[couplingType][i] = {}
+
+        return True
+
+    def reuseLowerLoops(self, cachedRGEs):
+        """ Re-uses the RGEs computed at lower loop orders in a previous run.
+            Only the missing loop orders are then computed. """
+
+        reused = []
+        for couplingType, terms in self.toCalculate.items():
+            if couplingType not in cachedRGEs['terms'] or cachedRGEs['terms'][couplingType] != terms:
+                continue
+
+            nLoops = min(cachedRGEs['loops'][couplingType], self.loopDic[couplingType])
+            for n in range(nLoops):
+                self.allRGEs[couplingType][n] = list(cachedRGEs['allRGEs'][couplingType][n])
+                self.couplingRGEs[couplingType][n] = {c: RGE for c, RGE in cachedRGEs['couplingRGEs'][couplingType][n].items()
+                                                      if self.isSelected(couplingType, c)}
+
+            if nLoops > 0:
+                reused.append(f"{couplingType} ({nLoops}-loop)")
+
+        if reused != []:
+            loggingInfo("Re-using the RGEs computed in a previous run : " + ', '.join(reused) + '.')
+
+    def resumeBetaFunctions(self, content):
+        """ Re-uses the terms of the RGEs computed before the last checkpoint """
+
+        if content is None:
+            loggingInfo("No checkpoint was found for this model : starting the computation from scratch.")
+            return
+
+        if content['terms'] != {k:len(v) for k,v in self.toCalculate.items()} or content['loops'] != self.loopDic:
+            loggingInfo("Warning : the checkpoint does not correspond to this computation. Starting from scratch.")
+            return
+
+        nTerms = len(content['computedTerms'])
+        for couplingType, RGloops in content['allRGEs'].items():
+            for n, RGlist in RGloops.items():
+                self.allRGEs[couplingType][n] = list(RGlist)
+                nTerms += len(RGlist)
+
+        self.computedTerms = dict(content['computedTerms'])
+
+        loggingInfo(f"Resuming the computation from the last checkpoint ({nTerms} terms already computed).")
+
+    def baseTensors(self, RGmodule):
+        """ The tensors of RGmodule which are not lazily computed from other ones """
+
+        return {k:v for k,v in vars(RGmodule).items() if isinstance(v, Tensor) and not isinstance(v.dic, TensorDic)}
+
+    def reuseDiagrams(self, lastRun, RGmodule):
+        """ Incremental mode : the diagrams which only involve tensors left
+            unchanged since the last run are not computed again """
+
+        for RGclass in self.RGclasses.values():
+            RGclass.recordDiagrams = True
+
+        if lastRun is None:
+            loggingInfo("No previous run of this model was found : computing all the diagrams.")
+            return
+
+        tensors = self.baseTensors(RGmodule)
+        tensorNames = {id(v):k for k,v in tensors.items()}
+
+        if lastRun['YukPos'] != self.YukPos:
+            changed = set(tensors.keys())
+        else:
+            changed = {k for k,v in tensors.items() if k not in lastRun['tensors'] or lastRun['tensors'][k] != dict(v.dic)}
+
+        nReused, nTotal = 0, 0
+        for couplingType, RGclass in self.RGclasses.items():
+            lastValues = {}
+            for k,v in lastRun['diagrams'].get(couplingType, {}).items():
+                if k[0] not in lastValues:
+                    lastValues[k[0]] = {}
+                lastValues[k[0]][k] = v
+
+            for funcList in RGclass.functions:
+                for func in funcList:
+                    nTotal += 1
+                    deps = RGclass.diagramDependencies(func, tensorNames)
+                    if deps is None or deps & changed != set():
+                        continue
+                    nReused += 1
+                    RGclass.diagramCache.update(lastValues.get(func.__name__, {}))
+
+        loggingInfo(f"Incremental mode : changes found in {', '.join(sorted(changed)) if changed else 'no tensor'}. "
+                    + f"Re-using {nReused} out of {nTotal} diagrams.")
+
+    def lastRunData(self, RGmodule):
+        """ The data needed to perform an incremental computation in a later run """
+
+        return {'YukPos': self.YukPos,
+                'tensors': {k:dict(v.dic) for k,v in self.baseTensors(RGmodule).items()},
+                'diagrams': {couplingType: RGclass.diagramValues for couplingType, RGclass in self.RGclasses.items()}}
+
+    def computeBetaFunctions(self, checkpoint=None):
         loggingInfo("Computing the RGES ...")
+
+        # Terms computed but not yet stored in allRGEs (resumed from a checkpoint,
+        # or received out of order from the pool of processes)
+        self.computedTerms = {}
+
+        # Possibly resume a previous computation
+        if checkpoint is not None and checkpoint.resume:
+            self.resumeBetaFunctions(checkpoint.load())
+
+        nProcesses = self.runSettings['Processes']
+        if nProcesses > 1 and not canRunInParallel():
+            loggingInfo("Warning : the parallel computation is not available on this platform. Using a single process.")
+            nProcesses = 1
+
+        if nProcesses > 1:
+            # All the remaining terms are sent at once to the pool of processes.
+            # The results are stored as they arrive, and retrieved in the same
+            # order as in the serial computation.
+            tasks, taskKeys = [], []
+            for couplingType, terms in self.toCalculate.items():
+                for n in range(self.loopDic[couplingType]):
+                    for i, term in enumerate(terms):
+                        if (i >= len(self.allRGEs[couplingType][n]) and i in self.neededTerms[couplingType]
+                            and (couplingType, n, i) not in self.computedTerms):
+                            tasks.append((couplingType, n, term))
+                            taskKeys.append((couplingType, n, i))
+
+            results = parallelCompute(self, tasks, nProcesses)
+
+            def compute(couplingType, term, n, i):
+                while (couplingType, n, i) not in self.computedTerms:
+                    pos, result = next(results)
+                    self.computedTerms[taskKeys[pos]] = result
+                    if checkpoint is not None:
+                        checkpoint.update(self)
+                return self.computedTerms.pop((couplingType, n, i))
+        else:
+            compute = lambda couplingType, term, n, i: self.RGclasses[couplingType].compute(*term, nLoops=n)
+
         for couplingType, terms in self.toCalculate.items():
             if self.loopDic[couplingType] == 0:
                 continue
@@ -973,9 +1307,29 @@ class Model(object):
                 loggingInfo("         -> " + str(n+1) + "-loop")
                 print_progress(0, len(terms), prefix=' '*8, bar_length=10, printTime=self.times)
                 for i, term in enumerate(terms):
-                    self.allRGEs[couplingType][n].append(self.RGclasses[couplingType].compute(*term, nLoops=n))
+                    if i >= len(self.allRGEs[couplingType][n]):
+                        if i not in self.neededTerms[couplingType]:
+                            self.allRGEs[couplingType][n].append(Integer(0))
+                        elif (couplingType, n, i) in self.computedTerms:
+                            self.allRGEs[couplingType][n].append(self.computedTerms.pop((couplingType, n, i)))
+                        else:
+                            self.allRGEs[couplingType][n].append(compute(couplingType, term, n, i))
+
+                        if checkpoint is not None:
+                            checkpoint.update(self)
                     print_progress(i+1, len(terms), prefix=' '*8, bar_length=10, printTime=self.times, logProgress=True)
 
+        if checkpoint is not None:
+            checkpoint.clear()
+
+        if nProcesses > 1:
+            results.close()
+        else:
+            nPruned = sum([RGclass.nPruned for RGclass in self.RGclasses.values()])
+            loggingDebug(f"     Structurally vanishing diagrams skipped : {nPruned}")
+            if Tensor.contractionEngine == 'pairwise':
+                loggingDebug("     Sub-contraction cache : " + subContractions.stats())
+
         loggingInfo("    ... Done")
 
     def mapBetaFunctions(self):
@@ -987,11 +1341,15 @@ class Model(object):
         for couplingType, RGlist in self.allRGEs.items():
             nTot += len(self.potential[couplingType])*self.loopDic[couplingType]
 
-
+        # Each task is the computation of the RGE of a coupling at a given loop order
+        tasks = []
         for couplingType, RGloops in self.allRGEs.items():
-            mat = self.lagrangianMapping[couplingType]
+            mappingRows = self.mappingRows(couplingType)
             for n, RGlist in RGloops.items():
-                couplingRGEs = mat*Matrix(RGlist)
+                # This loop order may have been re-used from a previous run
+                if self.couplingRGEs[couplingType][n] != {}:
+                    count += len(self.potential[couplingType])
+                    continue
 
                 # Take into account the beta-exponent
                 expFactor = 1
@@ -1001,11 +1359,42 @@ class Model(object):
                         expFactor = Pow(4*pi, exponent)
 
                 for pos, coupling in enumerate(list(self.potential[couplingType])):
-                    try:
-                        self.couplingRGEs[couplingType][n][coupling] = expand(couplingRGEs[pos]*expFactor)
-                    except BaseException as e:
-                        loggingCritical(f"Error expanding term at : {couplingType}, {n}, {pos}")
-                        loggingCritical(e)
-                        exit()
-                    count += 1
-                    print_progress(count, nTot, prefix='    ', bar_length=20, printTime=self.times)
+                    if not self.isSelected(couplingType, coupling):
+                        count += 1
+                        continue
+                    tasks.append((couplingType, n, coupling, mappingRows.get(pos, []), expFactor))
+
+        nProcesses = self.runSettings['Processes'] if canRunInParallel() else 1
+
+        results = {}
+        if nProcesses > 1 and len(tasks) > 1:
+            for i, result in parallelRecombine(self, tasks, nProcesses):
+                results[i] = result
+                count += 1
+                print_progress(count, nTot, prefix='    ', bar_length=20, printTime=self.times)
+        else:
+            for i, (couplingType, n, coupling, row, expFactor) in enumerate(tasks):
+                try:
+                    results[i] = self.recombine(self.allRGEs[couplingType][n], row, expFactor)
+                except BaseException as e:
+                    loggingCritical(f"Error expanding term at : {couplingType}, {n}, {coupling}")
+                    loggingCritical(e)
+                    exit()
+                count += 1
+                print_progress(count, nTot, prefix='    ', bar_length=20, printTime=self.times)
+
+        # The RGEs are stored in the same order, whatever the order of completion
+        for i, (couplingType, n, coupling, row, expFactor) in enumerate(tasks):
+            self.couplingRGEs[couplingType][n][coupling] = results[i]
+
+
+    def recombine(self, RGlist, row, expFactor):
+        """ Product of a row of the mapping matrix, given as [(column, value)],
+            with the RGE terms, accumulated term by term """
+
+        acc = PolyAccumulator()
+        for j, val in row:
+            if RGlist[j] != 0:
+                acc.add(RGlist[j], val)
+
+        return acc.toExpr(expFactor)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from sys import exit
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Logging import loggingCritical
+
+# The model whose RGEs are computed. It is set before the creation of the
+# worker processes, which inherit it (together with all the tensors of the
+# RGEs module) when they are forked.
+poolModel = None
+
+
+def computeTask(task):
+    """ Computes a single term of the RGEs in a worker process """
+
+    couplingType, n, term = task
+
+    RGclass = poolModel.RGclasses[couplingType]
+
+    try:
+        result = RGclass.compute(*term, nLoops=n)
+    except SystemExit:
+        # An error was already reported by the worker
+        raise RuntimeError(f"Error while computing the {n+1}-loop {couplingType} RGEs.")
+
+    # The diagrams recorded in incremental mode are sent back with the result
+    diagramValues, RGclass.diagramValues = RGclass.diagramValues, {}
+
+    return result, diagramValues
+
+
+def canRunInParallel():
+    """ The tensors are shipped to the workers by forking the main process """
+
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def taskCost(model, task, nnz):
+    """ Rough estimate of the cost of a task : number of diagrams times the number
+        of distinct orderings of the external indices, times the number of
+        non-zero operands for each additional loop """
+
+    couplingType, n, term = task
+
+    nDiagrams = len([c for c in model.RGclasses[couplingType].coefficients[n] if c != 0])
+    nOrderings = len(set(itertools.permutations(term)))
+
+    return nDiagrams * nOrderings * nnz**n
+
+
+def scheduleTasks(model, tasks):
+    """ Returns the positions of the tasks, sorted from the most to the least
+        expensive one """
+
+    RGmodule = next(iter(model.RGclasses.values())).rm
+    nnz = max(2, sum([len(t.dic) for t in (RGmodule.T, RGmodule.Ts, RGmodule.y, RGmodule.l)]))
+
+    costs = [taskCost(model, task, nnz) for task in tasks]
+
+    return sorted(range(len(tasks)), key=lambda i: -costs[i])
+
+
+def recombineTask(task):
+    """ Computes the RGE of a single coupling from the RGE terms, in a worker process """
+
+    couplingType, n, coupling, row, expFactor = task
+
+    return poolModel.recombine(poolModel.allRGEs[couplingType][n], row, expFactor)
+
+
+def poolMap(model, function, tasks, nProcesses, order=None):
+    """ Applies the function to the tasks using a pool of forked processes.
+        This is a generator yielding the couples (position of the task, result)
+        as soon as the tasks are completed. The tasks are submitted in the
+        given order (by default, in the order of the list). """
+
+    global poolModel
+    poolModel = model
+
+    context = multiprocessing.get_context('fork')
+
+    if order is None:
+        order = range(len(tasks))
+
+    try:
+        with ProcessPoolExecutor(max_workers=nProcesses, mp_context=context) as executor:
+            # The pool hands the tasks over to the workers one at a time, as
+            # soon as a worker becomes idle.
+            futures = {}
+            for i in order:
+                futures[executor.submit(function, tasks[i])] = i
+
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            except BaseException:
+                # The tasks which did not start yet are not run : the error is
+                # reported as soon as the running ones are over
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    except Exception as e:
+        loggingCritical("Error during the parallel computation of the RGEs :")
+        loggingCritical('>> ' + str(e))
+        exit()
+    finally:
+        poolModel = None
+
+
+def parallelCompute(model, tasks, nProcesses):
+    """ Computes the tasks (couplingType, nLoops, term) using a pool of processes.
+        This is a generator yielding the couples (position of the task, result)
+        as soon as the tasks are completed. """
+
+    # The 2-point tensors are needed by most of the tasks : they are computed
+    # once here, before the workers are forked, together with the
+    # sub-contractions they fill the cache with.
+    next(iter(model.RGclasses.values())).rm.computeTwoPointTensors()
+
+    # The tasks are submitted longest-first
+    for i, (result, diagramValues) in poolMap(model, computeTask, tasks, nProcesses, order=scheduleTasks(model, tasks)):
+        model.RGclasses[tasks[i][0]].diagramValues.update(diagramValues)
+        yield i, result
+
+
+def parallelRecombine(model, tasks, nProcesses):
+    """ Computes the tasks (couplingType, nLoops, coupling, row, expFactor) of
+        mapBetaFunctions using a pool of processes. The RGE terms are inherited
+        by the workers, only the rows of the mapping matrix are sent to them. """
+
+    return poolMap(model, recombineTask, tasks, nProcesses)
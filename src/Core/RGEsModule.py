@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from Logging import loggingInfo, loggingCritical
+from Logging import loggingInfo, loggingCritical, loggingDebug
 from sys import exit
 
 from sympy import (BlockMatrix, I, Identity, Matrix, Rational, SparseMatrix, Symbol,
@@ -88,6 +88,7 @@ class RGEsModule():
 
         # Close the DB, since all stored object must have been read by now
         self.model.idb.close()
+        loggingDebug("PyLieDB cache : " + self.model.idb.cacheStats())
 
     def constructT(self):
         """ Construct the fermion gauge generators """
@@ -337,10 +338,18 @@ class RGEsModule():
         for k,val in self.Vdic.items():
             self.v.dic[k] = val
 
+        self.initTwoPointTensors()
+
+    def initTwoPointTensors(self):
         #############################################
         #####  Definition of 2-point functions  #####
         #############################################
 
+        # Remove the 2-point tensors possibly defined for other loop orders
+        for name in getattr(self, 'twoPointTensors', []):
+            delattr(self, name)
+        previousAttributes = set(vars(self))
+
         def requirement(gauge, yukawa, quartic):
             g = self.model.loopDic['GaugeCouplings'] >= gauge if gauge is not None else False
             y = max(self.model.loopDic['Yukawas'],
@@ -545,6 +554,21 @@ class RGEsModule():
                                               self.yt(c_,l_,i_),
                                               doTrace=True, yukSorting=self.model.YukPos))
 
+        self.twoPointTensors = [k for k in vars(self) if k not in previousAttributes]
+
+    def computeTwoPointTensors(self):
+        """ Evaluates all the lazily defined 2-point tensors (C2S, Y2F, ...) """
+
+        for tensor in list(vars(self).values()):
+            if not isinstance(tensor, Tensor) or not isinstance(tensor.dic, TensorDic):
+                continue
+            if tensor.dic.tilde:
+                continue
+
+            for k in list(tensor.dic.keys()):
+                tensor.dic[k]
+
+            tensor.clearIndexes()
 
     def G_(self, A, B):
         if self.nonZeroGauge(A,B):
@@ -322,7 +322,10 @@ def doSubstitutions(self, substitutionDic, inconsistentRGEerror=False):
 
             deriv = diff(v[1], k)
 
-            for nLoop, RGEdic in self.couplingRGEs[cType].items():
+            # The RGE may not have been computed (see the 'Couplings' setting)
+            for nLoop, RGEdic in self.couplingRGEs.get(cType, {}).items():
+                if str(k) not in RGEdic:
+                    continue
                 newRGE = expand(deriv * RGEdic[str(k)]).subs(k, v[2], simultaneous=True)
                 self.couplingRGEs[cType][nLoop][str(k)] = newRGE
 
@@ -744,7 +747,11 @@ def doSubstitutions(self, substitutionDic, inconsistentRGEerror=False):
             self.allCouplings = insertKey(self.allCouplings, str(k), str(v[0]), (cType, v[0]))
             self.couplingsPos[cType] = insertKey(self.couplingsPos[cType], str(k), str(v[0]), self.couplingsPos[cType][str(k)]+.5)
 
-            for nLoop, RGEdic in self.couplingRGEs[cType].items():
+            # The RGEs may not have been computed (see the 'Couplings' setting)
+            for nLoop, RGEdic in self.couplingRGEs.get(cType, {}).items():
+                if not all([str(el[0] if not isinstance(el[0], conjugate) else el[0].args[0]) in RGEdic for el in v[2]]):
+                    continue
+
                 newRGE = Integer(0)
                 for el in v[2]:
                     if not isinstance(el[0], conjugate):
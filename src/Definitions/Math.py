@@ -1,4 +1,4 @@
-from sympy import MatAdd, MatMul, flatten
+from sympy import Add, MatAdd, MatMul, flatten, radsimp, sympify
 from sympy import expand as sympyExpand
 
 import itertools
@@ -105,3 +105,148 @@ def expand(expr, factor=1, depth=0):
 
             ret.append(tmp)
         return MatAdd(*ret)
+
+
+def isExpanded(expr):
+    """ Structural test returning True if expand() would leave expr unchanged,
+        i.e. if no sum appears in a product or in a positive integer power """
+
+    if expr.is_Atom:
+        return True
+    if expr.is_Mul and any([arg.is_Add for arg in expr.args]):
+        return False
+    if expr.is_Pow and expr.base.is_Add and expr.exp.is_Integer and expr.exp > 0:
+        return False
+
+    return all([isExpanded(arg) for arg in expr.args])
+
+
+class PolyAccumulator():
+    """ Exact accumulator for sums of expressions. The sum is stored in expanded
+        form as a dict {monomial: numerical coefficient}, where the monomials are
+        SymPy products of couplings in which Yukawa matrices and traces are opaque
+        (possibly non-commutative) generators. Adding a term is thus a dict update,
+        and the SymPy expression of the sum is only built once, by toExpr(). """
+
+    def __init__(self, expr=0):
+        self.terms = {}
+        if not isZero(expr):
+            self.add(expr)
+
+    def add(self, expr, factor=1):
+        """ Adds factor*expr to the sum """
+
+        factor = sympify(factor)
+        if not factor.is_Number:
+            expr, factor = factor*expr, 1
+
+        if isinstance(expr, PolyAccumulator):
+            items = expr.terms.items()
+        else:
+            expr = sympify(expr)
+            if not isExpanded(expr):
+                expr = sympyExpand(expr)
+            items = [term.as_coeff_Mul()[::-1] for term in Add.make_args(expr)]
+
+        for monomial, coeff in items:
+            self.addTerm(monomial, factor*coeff)
+
+        return self
+
+    def addTerm(self, monomial, coeff):
+        """ Adds coeff*monomial to the sum, where monomial is not further expanded """
+
+        if monomial not in self.terms:
+            self.terms[monomial] = coeff
+        else:
+            self.terms[monomial] += coeff
+
+    def toExpr(self, factor=1):
+        """ Returns the SymPy expression of factor times the sum """
+
+        terms = [coeff*factor*monomial for monomial, coeff in self.terms.items() if coeff != 0]
+
+        if not any([getattr(t, 'is_Matrix', False) for t in terms]):
+            return Add(*terms)
+
+        # Matrix expressions must be added one by one
+        ret = terms[0]
+        for t in terms[1:]:
+            ret += t
+        return ret
+
+
+def exactNumber(expr):
+    """ Canonical form of an exact number, with rationalized denominators """
+
+    expr = sympyExpand(expr)
+    if expr.is_Rational:
+        return expr
+    return sympyExpand(radsimp(expr))
+
+
+class SparseLU():
+    """ Exact LU factorization of a sparse square matrix, given as a dict
+        {row: {column: value}} of its non-zero entries. The pivots are chosen
+        to limit the fill-in, and the linear systems are then solved by sparse
+        forward and backward substitutions. Raises a ValueError if the matrix
+        is singular. """
+
+    def __init__(self, rows, n):
+        self.n = n
+
+        # Elimination steps (pivot row, row, multiplier) of the L factor
+        self.lower = []
+        # Rows (pivot row, pivot column, {column: value}) of the U factor
+        self.upper = []
+
+        remaining = {i: dict(rows.get(i, {})) for i in range(n)}
+
+        while remaining != {}:
+            # Markowitz-like choice : the sparsest row, and in this row the
+            # column with the least entries among the remaining rows
+            r = min(remaining, key=lambda i: (len(remaining[i]), i))
+            pivotRow = remaining.pop(r)
+
+            if pivotRow == {}:
+                raise ValueError("The matrix is singular.")
+
+            colCount = {c: 0 for c in pivotRow}
+            for row in remaining.values():
+                for c in row:
+                    if c in colCount:
+                        colCount[c] += 1
+            c = min(pivotRow, key=lambda j: (colCount[j], j))
+            pivot = pivotRow[c]
+
+            for i, row in remaining.items():
+                if c not in row:
+                    continue
+                m = exactNumber(row[c]/pivot)
+                for j, val in pivotRow.items():
+                    newVal = exactNumber(row.get(j, 0) - m*val)
+                    if newVal != 0:
+                        row[j] = newVal
+                    elif j in row:
+                        del row[j]
+                self.lower.append((r, i, m))
+
+            self.upper.append((r, c, pivotRow))
+
+    def solve(self, b):
+        """ Returns the solution x of A.x = b, where b is given as a dict
+            {row: value}. The result is a dict {column: value}. """
+
+        b = dict(b)
+        for r, i, m in self.lower:
+            if r in b:
+                b[i] = exactNumber(b.get(i, 0) - m*b[r])
+
+        x = {}
+        for r, c, row in reversed(self.upper):
+            val = b.get(r, 0) - sum([v*x[j] for j, v in row.items() if j != c and j in x])
+            val = exactNumber(val/row[c])
+            if val != 0:
+                x[c] = val
+
+        return x
@@ -6,6 +6,10 @@ from Logging import loggingCritical
 from sympy import Symbol, Mul, MatMul, conjugate, SparseMatrix, Matrix, Pow, diag
 
 
+def rebuildSymbol(cls, args, kwargs):
+    return cls(*args, **kwargs)
+
+
 class mSymbol(Symbol):
     """ mSymbol(name, n, m, **assumptions) """
 
@@ -25,6 +29,14 @@ class mSymbol(Symbol):
         obj.shape = (args[1], args[2])
         return obj
 
+    def __reduce_ex__(self, proto):
+        # Needed to pickle the matrix symbols, e.g. when sending results across processes
+        kwargs = {'symmetric': getattr(self, 'is_symmetric', False),
+                  'hermitian': self.is_hermitian is True and self.shape != (1,1),
+                  'real': (getattr(self, 'is_realMatrix', False) if self.shape != (1,1) else self.is_real is True),
+                  'unitary': getattr(self, 'is_unitary', False)}
+        return (rebuildSymbol, (type(self), (self.name, *self.shape), kwargs))
+
     def _eval_transpose(self):
         if self.shape == (1,1) or self.is_symmetric:
             return self
@@ -123,6 +135,9 @@ class Identity(mSymbol):
     def __new__(cls, n):
         return mSymbol.__new__(cls, "I", n, n)
 
+    def __reduce_ex__(self, proto):
+        return (rebuildSymbol, (type(self), (self.shape[0],), {}))
+
     def _eval_transpose(self):
         return self
 
@@ -1,9 +1,10 @@
-from sympy import Wild
+from sympy import Add, MatrixExpr, Mul, S, Wild, sympify
 
 import itertools
-from .Math import isZero, expand
+from math import factorial
+from .Math import isZero, expand, PolyAccumulator
 from .Symbols import mMul
-from .Trace import trace, sortYukTrace
+from .Trace import trace, sortYukTrace, wordTables
 
 
 
@@ -44,12 +45,97 @@ class TensorDic(dict):
             return ret
 
 class Tensor():
+    # Default engine used by tensorContract : 'pairwise' or 'nested'
+    contractionEngine = 'pairwise'
+
     def __init__(self, ranges, dic=None, sym=False):
         self.dim = len(ranges)
         self.range = tuple(ranges)
         self.dic = dict() if dic == None else dic
         self.sym = sym
 
+    @property
+    def dic(self):
+        return self._dic
+
+    @dic.setter
+    def dic(self, dic):
+        self._dic = dic
+        self.clearIndexes()
+
+    def clearIndexes(self):
+        """ Drops the secondary indexes used by iMatch. They will be lazily
+            re-built from the current content of self.dic """
+
+        self._indexes = {}
+        self._indexedSize = len(self._dic) if self._dic is not None else 0
+
+    def indexedKeys(self, positions, values):
+        """ Returns the list of keys k such that k[p] == v for all (p,v) in
+            zip(positions, values). The index associated with a given set of
+            positions is built the first time it is requested.
+
+            Components may be removed from the dic once the tensor is in use
+            (a TensorDic drops the vanishing components when they are computed) :
+            the corresponding stale keys are simply filtered out here. On the other
+            hand, adding new components invalidates all the indexes. """
+
+        if len(self._dic) > self._indexedSize:
+            self.clearIndexes()
+        elif len(self._dic) < self._indexedSize:
+            self._indexedSize = len(self._dic)
+
+        if positions not in self._indexes:
+            index = {}
+            if not self.sym:
+                for k in self._dic:
+                    subKey = tuple([k[p] for p in positions])
+                    if subKey not in index:
+                        index[subKey] = [k]
+                    else:
+                        index[subKey].append(k)
+            else:
+                # For symmetric tensors, the index maps each value to the keys
+                # containing it, whatever its position
+                for k in self._dic:
+                    for el in set(k):
+                        if el not in index:
+                            index[el] = [k]
+                        else:
+                            index[el].append(k)
+            self._indexes[positions] = index
+
+        index = self._indexes[positions]
+
+        if not self.sym:
+            matches = index.get(tuple(values), [])
+        else:
+            candidates = [index.get(v, []) for v in values]
+            matches = min(candidates, key=len)
+
+        return [k for k in matches if k in self._dic]
+
+    def hasComponents(self, positions, values):
+        """ Returns True if at least one of the components of the tensor has
+            the given values at the given index positions """
+
+        if positions == ():
+            return len(self._dic) > 0
+
+        if not self.sym:
+            return self.indexedKeys(positions, values) != []
+
+        for k in self.indexedKeys((), values):
+            remain = list(k)
+            for v in values:
+                if v not in remain:
+                    break
+                remain.remove(v)
+            else:
+                return True
+
+        return False
+
     def iMatch(self, inds, dummySubs = {}, freeDummies=[]):
         """ Returns all indices matching a given form.
             e.g. T(1,i,j,2) -> all indices with T(1,#,#,2) will match """
@@ -75,8 +161,16 @@ class Tensor():
         dummList = list(dummies.keys())
         retList = []
 
+        if nonDummyPos != []:
+            if not self.sym:
+                keys = self.indexedKeys(tuple(nonDummyPos), [inds[pos] for pos in nonDummyPos])
+            else:
+                keys = self.indexedKeys((), [inds[pos] for pos in nonDummyPos])
+        else:
+            keys = list(self.dic.keys())
+
         if not self.sym:
-            for k in list(self.dic.keys()):
+            for k in keys:
                 for pos in nonDummyPos:
                     if k[pos] != inds[pos]:
                         break
@@ -90,7 +184,7 @@ class Tensor():
 
         else:
             permFactor = 1
-            for k in list(self.dic.keys()):
+            for k in keys:
                 symRemain = list(k)
                 nonDummy = []
                 for pos in nonDummyPos:
@@ -167,13 +261,372 @@ def readContraction(*tensorsWithInds, depth=0):
     return nTensors, tensors, indices, freeDummies
 
 
-def tensorContract(*tensorsWithInds, depth=0, value=1, dummySubs={}, freeDummies=[], doTrace=False, yukSorting=None, expandExpr=False, verbose=False, doit=False):
+def isCommutativeDic(dic):
+    """ Returns True if all the components of the tensor are commutative objects.
+        The components of a TensorDic are lazily computed, so in this case the
+        answer is inferred from the contraction defining them. """
+
+    if dic is None:
+        return False
+
+    if isinstance(dic, TensorDic):
+        if dic.tilde:
+            return isCommutativeDic(dic.tildeRef)
+        if dic.kwargs.get('doTrace', False):
+            return True
+        return all([isCommutativeDic(t[0].dic) for t in dic.args])
+
+    return all([getattr(v, 'is_commutative', True) is not False for v in dic.values()])
+
+
+def nEntries(tensor):
+    """ Number of matches returned by tensor.iMatch when no index is fixed """
+
+    if not tensor.sym:
+        return len(tensor.dic)
+
+    n = 0
+    for k in tensor.dic:
+        perms = factorial(len(k))
+        for el in set(k):
+            perms //= factorial(k.count(el))
+        n += perms
+    return n
+
+
+# Contraction plans are computed once per contraction signature
+contractionPlans = {}
+
+def contractionOrder(tensorsWithInds):
+    """ Returns the order in which tensorContract should loop over the tensors,
+        or None if the contraction is to be performed in the original order.
+        The plan only depends on the tensors and on the positions of the dummy
+        indices, so that it is computed once and then cached. """
+
+    signature = tuple([(id(t[0]),) + tuple([(i if isinstance(i, Wild) else None) for i in t[1:]]) for t in tensorsWithInds])
+
+    if signature not in contractionPlans:
+        # The tensors are kept alive together with the plan, so that their id()
+        # cannot be re-used by another tensor
+        contractionPlans[signature] = (planContraction(tensorsWithInds), [t[0] for t in tensorsWithInds])
+
+    return contractionPlans[signature][0]
+
+def planContraction(tensorsWithInds):
+    """ Finds the ordering of the tensors minimizing the estimated number of
+        partial index assignments visited by the nested loops of tensorContract.
+
+        The number of assignments after having looped over a subset S of tensors is
+        estimated from the number of components of each tensor, divided by the range
+        of each fixed index and of each index contracted inside S. The optimal
+        ordering is then found by dynamic programming over the subsets of tensors.
+
+        Tensors with non-commutative components (Yukawa matrices, ...) always keep
+        their relative order, since it determines the order of the matrix products. """
+
+    n = len(tensorsWithInds)
+    tensors = [t[0] for t in tensorsWithInds]
+
+    if n < 2 or any([t.dic is None for t in tensors]):
+        return None
+
+    commutative = [isCommutativeDic(t.dic) for t in tensors]
+    nonComm = [i for i in range(n) if not commutative[i]]
+
+    weights = []
+    dummies = {}
+    for pos, (t, *inds) in enumerate(tensorsWithInds):
+        w = float(nEntries(t))
+        for p, i in enumerate(inds):
+            if not isinstance(i, Wild):
+                w /= max(t.range[p], 1)
+            elif i not in dummies:
+                dummies[i] = (max(t.range[p], 1), [pos])
+            else:
+                dummies[i][1].append(pos)
+        weights.append(w)
+
+    def count(mask):
+        c = 1.
+        for pos in range(n):
+            if mask & (1 << pos):
+                c *= weights[pos]
+        for r, positions in dummies.values():
+            m = len([pos for pos in positions if mask & (1 << pos)])
+            if m > 1:
+                c /= r**(m-1)
+        return c
+
+    # best[mask] = (cost, ordering) for the subset of tensors encoded in mask
+    best = {0: (0., ())}
+    for mask in range(1, 1 << n):
+        c = None
+        # Loop in reversed order so that, in case of a tie, the original order is kept
+        for pos in reversed(range(n)):
+            if not mask & (1 << pos):
+                continue
+            prev = mask ^ (1 << pos)
+            if prev not in best:
+                continue
+            if not commutative[pos]:
+                if any([(k < pos) != bool(prev & (1 << k)) for k in nonComm if k != pos]):
+                    continue
+            if c is None:
+                c = count(mask)
+            cost = best[prev][0] + c
+            if mask not in best or cost < best[mask][0]*(1 - 1e-9):
+                best[mask] = (cost, best[prev][1] + (pos,))
+
+    order = best[(1 << n) - 1][1]
+    if order == tuple(range(n)):
+        return None
+    return order
+
+
+class SubContractionCache():
+    """ Run-wide cache of the intermediate tensors produced by the pairwise
+        engine. Each intermediate is keyed by the sub-contraction it results from,
+        up to a renaming of the dummy indices, so that a chain of tensors shared
+        by several diagrams is contracted only once per set of external indices. """
+
+    def __init__(self, maxSize=2*10**6):
+        # Maximal total number of components stored in the cache
+        self.maxSize = maxSize
+        self.clear()
+
+    def clear(self):
+        self.dic = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key not in self.dic:
+            return None
+        self.hits += 1
+        return self.dic[key][0]
+
+    def store(self, key, inter, tensors):
+        self.misses += 1
+        if self.size + len(inter) > self.maxSize:
+            return
+        # The tensors are kept alive together with the result, so that their id()
+        # cannot be re-used by another tensor
+        self.dic[key] = (inter, tensors)
+        self.size += len(inter)
+
+    def stats(self):
+        return f"{self.hits} hit{'s' if self.hits != 1 else ''}, {self.misses} miss{'es' if self.misses != 1 else ''}"
+
+subContractions = SubContractionCache()
+
+
+# Memoized numeric / symbolic splitting of the tensor components, and memoized
+# products and traces of the symbolic factors
+splitMemo = {}
+productMemo = {}
+traceMemo = {}
+
+def splitTerms(v):
+    """ Splits a tensor component into a tuple of (numerical coefficient, monomial)
+        pairs, where the monomials are products of couplings, Yukawa matrices, ...
+        Pure group theory quantities have a trivial monomial. Matrix expressions
+        (involving identity matrices) are kept as opaque monomials. """
+
+    if v in splitMemo:
+        return splitMemo[v]
+
+    if len(splitMemo) > 10**5:
+        splitMemo.clear()
+
+    v = sympify(v)
+    if v.is_Number:
+        ret = ((v, S.One),)
+    elif isinstance(v, MatrixExpr):
+        ret = (v.as_coeff_Mul() if isinstance(v, Mul) else (S.One, v),)
+    else:
+        ret = tuple([term.as_coeff_Mul() for term in Add.make_args(expand(v)) if term != 0])
+
+    splitMemo[v] = ret
+    return ret
+
+def symbolicProduct(s1, s2):
+    """ Product of two monomials, split again into (coefficient, monomial) pairs """
+
+    if s1 == 1:
+        return ((S.One, s2),)
+    if s2 == 1:
+        return ((S.One, s1),)
+
+    key = (s1, s2)
+    if key not in productMemo:
+        if len(productMemo) > 10**5:
+            productMemo.clear()
+        prod = mMul(s1, s2)
+        productMemo[key] = () if isZero(prod) else splitTerms(prod)
+
+    return productMemo[key]
+
+def sortedTrace(monomial, yukSorting):
+    """ Memoized trace of a monomial, with sorted Yukawa matrices """
+
+    key = (monomial, id(yukSorting))
+    if key not in traceMemo:
+        if len(traceMemo) > 10**5:
+            traceMemo.clear()
+        traceMemo[key] = sortYukTrace(trace(monomial), yukSorting)
+
+    return traceMemo[key]
+
+def clearMemos():
+    """ The memos are emptied when a new model is created : some of their keys
+        are ids of objects of the former model, which they keep alive """
+
+    subContractions.clear()
+    for memo in (contractionPlans, splitMemo, productMemo, traceMemo, wordTables):
+        memo.clear()
+
+
+def pairwiseContract(tensorsWithInds, value=1, freeDummies=[], doTrace=False, yukSorting=None, expandExpr=False):
+    """ Alternative evaluation of a contraction : the tensors are contracted one
+        after the other, each step producing a sparse intermediate tensor whose
+        keys are the values of the dummy indices still needed by the following
+        tensors (or free). The partial products shared by several branches of
+        the nested loops of tensorContract are thus computed only once, and the
+        intermediates are stored in the subContractions cache.
+
+        Each component of the intermediate tensors is stored as an expanded
+        polynomial {monomial: numerical coefficient}. The group theory factors are
+        thus multiplied as plain numbers, and SymPy products are only performed
+        (once) between the distinct monomials. """
+
+    n = len(tensorsWithInds)
+
+    # Canonical form of each sub-contraction made of the first tensors : the
+    # dummy indices are labelled by order of appearance. For each step, the open
+    # dummies are those appearing only once so far, in order of appearance.
+    labels = {}
+    keyParts, prefixKeys, openDummies = [], [], []
+    for t, *inds in tensorsWithInds:
+        for i in inds:
+            if isinstance(i, Wild):
+                if i not in labels:
+                    labels[i] = [len(labels), 1]
+                else:
+                    labels[i][1] += 1
+        keyParts.append((id(t),) + tuple([(('_', labels[i][0]) if isinstance(i, Wild) else i) for i in inds]))
+        prefixKeys.append(tuple(keyParts))
+        openDummies.append([i for i, (_, count) in labels.items() if count == 1])
+
+    useCache = (value == 1)
+
+    inter = {(): {symb: coeff for coeff, symb in splitTerms(value)}}
+    prevDummies = []
+    start = 0
+    if useCache:
+        for pos in reversed(range(1, n)):
+            cached = subContractions.get(prefixKeys[pos])
+            if cached is not None:
+                inter = cached
+                prevDummies = openDummies[pos]
+                start = pos+1
+                break
+
+    for pos in range(start, n):
+        if inter == {}:
+            break
+
+        t, *inds = tensorsWithInds[pos]
+        newInter = {}
+        for key, val in inter.items():
+            subs = {k:v for k,v in zip(prevDummies, key)}
+            for v, newSubs in t.iMatch(list(inds), dummySubs=subs):
+                newKey = tuple([newSubs[d] for d in openDummies[pos]])
+
+                if newKey not in newInter:
+                    newInter[newKey] = {}
+                newVal = newInter[newKey]
+
+                for vCoeff, vSymb in splitTerms(v):
+                    for symb, coeff in val.items():
+                        for pCoeff, pSymb in symbolicProduct(symb, vSymb):
+                            if pSymb not in newVal:
+                                newVal[pSymb] = coeff*vCoeff*pCoeff
+                            else:
+                                newVal[pSymb] += coeff*vCoeff*pCoeff
+
+        inter = {}
+        for key, val in newInter.items():
+            val = {symb: coeff for symb, coeff in val.items() if coeff != 0}
+            if val != {}:
+                inter[key] = val
+        prevDummies = openDummies[pos]
+
+        if useCache and pos > 0:
+            subContractions.store(prefixKeys[pos], inter, [el[0] for el in tensorsWithInds[:pos+1]])
+
+    result = {}
+    for key, val in inter.items():
+        # Attach the numerical coefficients to the monomials
+        acc = PolyAccumulator()
+        for symb, coeff in val.items():
+            if not doTrace:
+                acc.addTerm(symb, coeff)
+            elif yukSorting:
+                acc.add(sortedTrace(symb, yukSorting), coeff)
+            else:
+                acc.add(trace(coeff*symb))
+        tot = acc.toExpr()
+        if isZero(tot):
+            continue
+
+        # Map the open dummies onto the free dummies
+        subs = {k:v for k,v in zip(prevDummies, key)}
+        newKey = tuple([subs[fd] for fd in freeDummies])
+        if newKey not in result:
+            result[newKey] = tot
+        else:
+            result[newKey] += tot
+
+    if freeDummies == []:
+        return result.get((), 0)
+
+    for k in list(result.keys()):
+        if isZero(result[k]):
+            del result[k]
+        elif expandExpr:
+            result[k] = expand(result[k])
+
+    return result
+
+
+def tensorContract(*tensorsWithInds, depth=0, value=1, dummySubs={}, freeDummies=[], doTrace=False, yukSorting=None, expandExpr=False, verbose=False, doit=False, engine=None):
+    """ Contracts the tensors over their common dummy indices. The evaluation
+        is performed either by nested loops over the tensors ('nested' engine), or
+        by successive pairwise contractions ('pairwise' engine). If not specified,
+        the engine is given by Tensor.contractionEngine . """
+
     n, tensors, indices, freeD = readContraction(*tensorsWithInds, depth=depth)
 
+    if depth == 0:
+        # Possibly re-order the tensors to reduce the number of loop iterations.
+        # Note that the free dummies were identified using the original ordering.
+        order = contractionOrder(tensorsWithInds)
+        if order is not None:
+            tensorsWithInds = tuple([tensorsWithInds[pos] for pos in order])
+            tensors = [tensors[pos] for pos in order]
+            indices = [indices[pos] for pos in order]
+
     if depth == 0 and freeDummies == []:
         freeDummies = freeD
         doit = True
 
+    if depth == 0 and doit and n > 1:
+        if engine is None:
+            engine = Tensor.contractionEngine
+        if engine == 'pairwise':
+            return pairwiseContract(tensorsWithInds, value=value, freeDummies=freeDummies, doTrace=doTrace, yukSorting=yukSorting, expandExpr=expandExpr)
+
     if not doit:
         if n == 0:
             return None
@@ -181,7 +634,7 @@ def tensorContract(*tensorsWithInds, depth=0, value=1, dummySubs={}, freeDummies
         if freeDummies == []:
             pass
         else:
-            result = dict() if depth != 0 else TensorDic(*tensorsWithInds, freeDummies=freeDummies, doTrace=doTrace, yukSorting=yukSorting, expandExpr=expandExpr, verbose=verbose, doit=doit)
+            result = dict() if depth != 0 else TensorDic(*tensorsWithInds, freeDummies=freeDummies, doTrace=doTrace, yukSorting=yukSorting, expandExpr=expandExpr, verbose=verbose, doit=doit, engine=engine)
             for _,subs in tensors[0].iMatch(indices[0], dummySubs=dummySubs):
                 if verbose:
                     print(depth*"## ", subs)
@@ -260,15 +713,12 @@ def tensorAdd(*dics):
     setAllKeys = set(allKeys)
 
     for k in setAllKeys:
-        retDic[k] = 0
+        acc = PolyAccumulator()
         for dic in dics:
             if k in dic:
-                if isZero(retDic[k]):
-                    retDic[k] = dic[k]
-                else:
-                    retDic[k] += dic[k]
+                acc.add(dic[k])
 
-        retDic[k] = expand(retDic[k])
+        retDic[k] = acc.toExpr()
         if isZero(retDic[k]):
             del retDic[k]
 
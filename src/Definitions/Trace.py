@@ -1,6 +1,8 @@
 from sympy import (Expr, sympify, Basic, MatrixBase, Mul, flatten,
                    Add, transpose, adjoint, conjugate, expand, Symbol, Pow, Identity)
 
+from .Math import isExpanded
+
 class Trace(Expr):
     is_Trace = True
     is_commutative = True
@@ -44,7 +46,8 @@ def trace(expr):
 
 
 def sortYukTrace(expr, yukPos, depth=0):
-    expr = expand(expr)
+    if not isExpanded(expr):
+        expr = expand(expr)
     subTerms = flatten(expr.as_coeff_mul())
     coeff = Mul(*subTerms[:-1])
     tr = subTerms[-1]
@@ -82,40 +85,137 @@ def sortYukTrace(expr, yukPos, depth=0):
         return expr
 
     try:
-        transp = [isinstance(el, transpose) for el in args]
-        conj = [isinstance(el, conjugate) for el in args]
-
-        chooseTranspose = False
-        if all(transp):
-            args = tuple([transpose(el) for el in args])[::-1]
-        elif any(transp) or any(conj):
-            transposed = tuple([transpose(el) for el in args])[::-1]
-            if (not any([isinstance(el, transpose) for el in transposed])
-            and not any([isinstance(el, conjugate) for el in transposed])):
-                args = transposed
+        words = yukWords(yukPos)
+        word = tuple([words.encode(el) for el in args])
+    except AttributeError:
+        return sortYukTrace(trace(expand(tr.args[0])), yukPos, depth=depth+1)
+
+    return coeff * words.canonicalTrace(word)
+
+
+def leastRotation(word):
+    """ Booth's algorithm : position of the lexicographically least rotation of the word """
+
+    s = word + word
+    f = [-1]*len(s)
+    k = 0
+
+    for j in range(1, len(s)):
+        sj = s[j]
+        i = f[j-k-1]
+        while i != -1 and sj != s[k+i+1]:
+            if sj < s[k+i+1]:
+                k = j-i-1
+            i = f[i]
+        if sj != s[k+i+1]:
+            if sj < s[k]:
+                k = j
+            f[j-k] = -1
+        else:
+            f[j-k] = i+1
+
+    return k
+
+
+class YukWords():
+    """ Traces of products of Yukawa matrices, represented as words of integers.
+        The integer code of a matrix is ordered as yukSortKey (the conjugate
+        matrices come after the adjoint ones), so that the canonical form of a
+        trace is the least cyclic rotation of its word. The canonical traces are
+        memoized for each word. """
+
+    def __init__(self, yukPos):
+        self.yukPos = yukPos
+        self.base = max(yukPos.values(), default=0) + 1
+
+        self.codes = {}
+        self.elements = {}
+        self.transposed = {}
+        self.strings = {}
+        self.flipped = set()
+
+        self.traces = {}
+
+    def encode(self, el):
+        if el not in self.codes:
+            if isinstance(el, adjoint):
+                kind, pos, tie = 2, self.yukPos[el.args[0].name], 0
+            elif isinstance(el, conjugate):
+                kind, pos, tie = 2, self.yukPos[el.args[0].name], 1
+            elif isinstance(el, transpose):
+                kind, pos, tie = 3, self.yukPos[el.args[0].name], 0
             else:
-                count = str(args).count('transpose') + str(args).count('conjugate')
-                countTransposed = str(transposed).count('transpose') + str(transposed).count('conjugate')
-                if count < countTransposed:
-                    pass
-                elif count > countTransposed:
-                        args = transposed
+                kind, pos, tie = 1, self.yukPos[el.name], 0
+
+            code = 2*(kind*self.base + pos) + tie
+            self.codes[el] = code
+            self.elements[code] = el
+            self.strings[code] = str(el)
+            if isinstance(el, (transpose, conjugate)):
+                self.flipped.add(code)
+
+            # The code of the transposed matrix is computed along
+            tEl = transpose(el)
+            self.transposed[code] = self.encode(tEl)
+            self.transposed[self.codes[tEl]] = code
+
+        return self.codes[el]
+
+    def transpose(self, word):
+        return tuple([self.transposed[c] for c in word])[::-1]
+
+    def rotate(self, word):
+        k = leastRotation(word)
+        return word[k:] + word[:k]
+
+    def string(self, word):
+        """ The string of the tuple of matrices, as used by the former
+            implementation to choose between a word and its transpose """
+
+        strings = [self.strings[c] for c in word]
+        return '(' + ', '.join(strings) + (',' if len(strings) == 1 else '') + ')'
+
+    def canonicalTrace(self, word):
+        """ Trace of the canonical form of the word, among its cyclic rotations
+            and those of its transpose. The form with the least number of
+            transposed / conjugate matrices is chosen. """
+
+        if word not in self.traces:
+            newWord = word
+            flipped = [c in self.flipped for c in word]
+
+            if all(flipped) and all([isinstance(self.elements[c], transpose) for c in word]):
+                newWord = self.rotate(self.transpose(word))
+            elif any(flipped):
+                transposed = self.transpose(word)
+                count = sum(flipped)
+                countTransposed = sum([c in self.flipped for c in transposed])
+
+                if countTransposed == 0 or countTransposed < count:
+                    newWord = self.rotate(transposed)
+                elif count < countTransposed:
+                    newWord = self.rotate(word)
                 else:
-                    chooseTranspose = True
+                    candidates = (self.rotate(word), self.rotate(transposed))
+                    newWord = min(candidates, key=self.string)
+            else:
+                newWord = self.rotate(word)
 
-        newArgs = sorted(set([args[-i:] + args[:-i]  for i in range(len(args))]),
-                          key=lambda x:[yukSortKey(y, yukPos) for y in x])[0]
+            self.traces[word] = trace(Mul(*[self.elements[c] for c in newWord]))
 
-        if chooseTranspose:
-            newTransposed = sorted(set([transposed[-i:] + transposed[:-i]  for i in range(len(transposed))]),
-                              key=lambda x:[yukSortKey(y, yukPos) for y in x])[0]
+        return self.traces[word]
 
-            newArgs = (newArgs, newTransposed)[ [str(newArgs), str(newTransposed)].index(sorted((str(newArgs), str(newTransposed)))[0]) ]
 
-        return coeff * trace(Mul(*newArgs))
+# Word tables, for each dictionary of positions of the Yukawa matrices
+wordTables = {}
+
+def yukWords(yukPos):
+    key = id(yukPos)
+    if key not in wordTables:
+        wordTables[key] = YukWords(yukPos)
+
+    return wordTables[key]
 
-    except AttributeError:
-        return sortYukTrace(trace(expand(tr.args[0])), yukPos, depth=depth+1)
 
 def yukSortKey(term, yukPos):
     if isinstance(term, adjoint):
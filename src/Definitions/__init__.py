@@ -1,9 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from .GaugeGroup import GaugeGroup
-from .Math import expand
+from .Math import expand, PolyAccumulator, SparseLU
 from .Symbols import mSymbol, mMul, Identity
-from .Tensors import TensorDic, Tensor, tensorContract, tensorAdd, tensorMul
+from .Tensors import TensorDic, Tensor, tensorContract, tensorAdd, tensorMul, subContractions, clearMemos
 from .Trace import Trace, trace
 
 from sympy import flatten, Function, Mul, Pow, Symbol, Wild
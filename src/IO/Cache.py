@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import pickle
+import time
+
+from sympy import Function
+from sympy.core.function import UndefinedFunction
+
+from Logging import loggingInfo, loggingCritical
+
+# Entries of the model file which have no influence on the computation of the RGEs
+exportOnlyKeys = ('Author', 'Date', 'Substitutions', 'Latex', 'UFOMapping')
+
+
+class SnapshotPickler(pickle.Pickler):
+    """ The database is not stored in the snapshots : it is replaced by the
+        current instance when they are loaded. The undefined functions of
+        SymPy (used in the Latex output) are re-created from their names. """
+
+    def __init__(self, f, idb):
+        pickle.Pickler.__init__(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.idb = idb
+
+    def persistent_id(self, obj):
+        if obj is self.idb:
+            return 'PyLieDB'
+        if isinstance(obj, UndefinedFunction):
+            return ('Function', obj.__name__)
+        return None
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, f, idb):
+        pickle.Unpickler.__init__(self, f)
+        self.idb = idb
+
+    def persistent_load(self, pid):
+        if pid == 'PyLieDB':
+            return self.idb
+        return Function(pid[1])
+
+
+class ResultsCache():
+    """ Content-addressed on-disk cache of the RGEs computed for a given model.
+        The entries are stored in the cache folder, the least recently used
+        ones being removed when the size of the folder exceeds 'CacheSize'. """
+
+    def __init__(self, runSettings, yamlSettings):
+        self.enabled = runSettings['UseCache']
+
+        # The RGEs computed for a subset of the couplings are not stored
+        self.partial = runSettings['Couplings'] != 'all'
+        self.snapshot = runSettings['UseSnapshot']
+        self.incremental = runSettings['Incremental']
+        self.folder = runSettings['CacheFolder']
+        self.maxSize = runSettings['CacheSize']*1024**2
+        self.version = self.codeVersion()
+
+        self.key = self.computeKey(runSettings, yamlSettings)
+
+        # The RGEs computed at all the loop orders are stored in the same entry
+        self.path = os.path.join(self.folder, self.computeKey(runSettings, yamlSettings, runKeys=('RealBasis', 'NoKinMix')) + '.pkl')
+        self.content = None
+
+        # The snapshot of the initialized model does not depend on the loop
+        # orders, but on the whole content of the model file
+        self.snapshotPath = os.path.join(self.folder, self.computeKey(runSettings, yamlSettings,
+                                                                      runKeys=('RealBasis', 'NoKinMix', 'CheckGaugeInvariance', 'Couplings'),
+                                                                      ignoredKeys=()) + '.snapshot.pkl')
+
+        # In incremental mode, the data of the last run of the model is
+        # stored independently of the model content
+        if self.incremental:
+            self.lastRunPath = os.path.join(self.folder, self.computeKey(runSettings, {'Model': runSettings['Model']}) + '.last.pkl')
+
+    def computeKey(self, runSettings, yamlSettings, runKeys=('Loops', 'RealBasis', 'NoKinMix', 'Couplings'), ignoredKeys=exportOnlyKeys):
+        """ The key is a hash of the model content, of the relevant run settings
+            and of the source code of PyR@TE """
+
+        h = hashlib.sha256()
+
+        modelContent = {k:v for k,v in yamlSettings.items() if k not in ignoredKeys}
+        h.update(repr(modelContent).encode())
+
+        for k in runKeys:
+            h.update(f"{k}={runSettings[k]!r};".encode())
+
+        h.update(self.version.encode())
+
+        return h.hexdigest()
+
+    def codeVersion(self):
+        """ Hash of all the source files of PyR@TE """
+
+        h = hashlib.sha256()
+        srcFolder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        for root, dirs, files in sorted(os.walk(srcFolder)):
+            for f in sorted(files):
+                if f.endswith('.py'):
+                    h.update(f.encode())
+                    with open(os.path.join(root, f), 'rb') as file:
+                        h.update(file.read())
+
+        return h.hexdigest()
+
+    def read(self, path, idb=None):
+        """ Reads an entry of the cache, or returns None """
+
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                if idb is None:
+                    content = pickle.load(f)
+                else:
+                    content = SnapshotUnpickler(f, idb).load()
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError, RecursionError) as e:
+            loggingInfo("Warning : unable to read an entry of the cache. It will be ignored.")
+            loggingInfo('>> ' + str(e))
+            return None
+
+        # Mark the entry as recently used
+        os.utime(path)
+
+        return content
+
+    def write(self, path, content, idb=None):
+        """ Writes an entry of the cache, and possibly removes the least
+            recently used ones """
+
+        tmpPath = path + f'.{os.getpid()}.tmp'
+
+        try:
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+
+            with open(tmpPath, 'wb') as f:
+                if idb is None:
+                    pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    SnapshotPickler(f, idb).dump(content)
+            os.replace(tmpPath, path)
+        except (OSError, pickle.PickleError, AttributeError, TypeError, RecursionError) as e:
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+            loggingCritical("Warning : unable to write in the cache.")
+            loggingCritical('>> ' + str(e))
+            return
+        except BaseException:
+            # Interruptions are not swallowed, but no partial entry is left
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+            raise
+
+        self.evict(path)
+
+    def load(self):
+        """ Returns the RGEs computed in previous runs of the model (possibly
+            at other loop orders), or None if they are not in the cache """
+
+        if not self.enabled:
+            return None
+
+        self.content = self.read(self.path)
+
+        return self.content
+
+    def store(self, model):
+        """ Stores the RGEs of the model in the cache. For each coupling type,
+            the highest loop order computed so far is kept. """
+
+        if not self.enabled or self.partial:
+            return
+
+        content = {'terms': model.toCalculate,
+                   'loops': {couplingType: model.loopDic[couplingType] for couplingType in model.toCalculate},
+                   'allRGEs': dict(model.allRGEs),
+                   'couplingRGEs': dict(model.couplingRGEs)}
+
+        if self.content is not None:
+            for couplingType, nLoops in self.content['loops'].items():
+                if (couplingType in content['terms'] and nLoops > content['loops'][couplingType]
+                    and self.content['terms'][couplingType] == content['terms'][couplingType]):
+                    content['loops'][couplingType] = nLoops
+                    content['allRGEs'][couplingType] = self.content['allRGEs'][couplingType]
+                    content['couplingRGEs'][couplingType] = self.content['couplingRGEs'][couplingType]
+
+        self.write(self.path, content)
+
+    def loadSnapshot(self, idb):
+        """ Returns the model and the RGEs module initialized in a previous run,
+            or None if no snapshot was found """
+
+        if not self.snapshot:
+            return None
+
+        content = self.read(self.snapshotPath, idb=idb)
+
+        if content is not None:
+            loggingInfo("The initialized model was found in the cache. Skipping the setup.")
+            return content['model'], content['RGmodule']
+        return None
+
+    def storeSnapshot(self, model, RGmodule, idb):
+        if self.snapshot:
+            self.write(self.snapshotPath, {'model': model, 'RGmodule': RGmodule}, idb=idb)
+
+    def loadLastRun(self):
+        """ Incremental mode : returns the data stored after the last run of the model """
+
+        return self.read(self.lastRunPath)
+
+    def storeLastRun(self, content):
+        self.write(self.lastRunPath, content)
+
+    def evict(self, keep):
+        """ Removes the least recently used entries (except 'keep') until the
+            total size of the cache is below the limit """
+
+        entries = []
+        for f in os.listdir(self.folder):
+            if f.endswith('.pkl'):
+                path = os.path.join(self.folder, f)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        totalSize = sum([el[1] for el in entries])
+
+        for mtime, size, path in sorted(entries):
+            if totalSize <= self.maxSize:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                totalSize -= size
+            except OSError:
+                pass
+
+
+class Checkpoint():
+    """ Periodic snapshots of the progress of the RGE computation, stored in the
+        cache folder. They allow to resume an interrupted computation. """
+
+    def __init__(self, runSettings, cache):
+        self.cache = cache
+        self.path = os.path.join(cache.folder, cache.key + '.checkpoint.pkl')
+        self.resume = runSettings['Resume']
+
+        # The runs which do not use the cache only write checkpoints when resumed
+        self.interval = runSettings['CheckpointInterval'] if (cache.enabled or self.resume) else 0
+
+        self.lastSave = time.time()
+
+    def load(self):
+        return self.cache.read(self.path)
+
+    def update(self, model):
+        """ Stores the RGE terms computed so far, if the last checkpoint is old enough """
+
+        if self.interval <= 0 or time.time() - self.lastSave < self.interval:
+            return
+
+        self.cache.write(self.path, {'terms': {k:len(v) for k,v in model.toCalculate.items()},
+                                     'loops': model.loopDic,
+                                     'allRGEs': model.allRGEs,
+                                     'computedTerms': model.computedTerms})
+        self.lastSave = time.time()
+
+    def clear(self):
+        """ The computation is over : the checkpoint is removed """
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -49,6 +49,23 @@ class Inputs():
 
         self.initLogging(settings)
 
+        if os.path.abspath(settings['CacheFolder']) != settings['CacheFolder']:
+            settings['CacheFolder'] = os.path.abspath(os.path.join(wd, settings['CacheFolder']))
+
+        try:
+            settings['CacheSize'] = float(settings['CacheSize'])
+            if settings['CacheSize'] < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            loggingInfo("Warning : 'CacheSize' setting must be a positive number. Setting it to 500.")
+            settings['CacheSize'] = 500
+
+        try:
+            settings['CheckpointInterval'] = float(settings['CheckpointInterval'])
+        except (TypeError, ValueError):
+            loggingInfo("Warning : 'CheckpointInterval' setting must be a number. Setting it to 300.")
+            settings['CheckpointInterval'] = 300
+
         # A useful check before going on : no export was selected
         if not any((settings['LatexOutput'], settings['MathematicaOutput'], settings['PythonOutput'], settings['UFOfolder'])):
             loggingCritical("Error : No ouput would be produced after the computation. Please choose at least one export option (Latex, Mathematica, Python, UFO).")
@@ -68,6 +85,35 @@ class Inputs():
                 loggingInfo("Warning : RealBasis argument not understood. Setting it to 'adjoint'.")
                 settings['RealBasis'] = 'adjoint'
 
+        if 'ContractionEngine' in settings:
+            settings['ContractionEngine'] = str(settings['ContractionEngine']).lower()
+            if settings['ContractionEngine'] not in ('nested', 'pairwise'):
+                loggingInfo("Warning : ContractionEngine argument not understood. Setting it to 'pairwise'.")
+                settings['ContractionEngine'] = 'pairwise'
+
+        if 'Processes' in settings:
+            try:
+                settings['Processes'] = int(settings['Processes'])
+                if settings['Processes'] < 1:
+                    raise ValueError
+            except (TypeError, ValueError):
+                loggingInfo("Warning : 'Processes' setting must be a positive integer. Setting it to 1.")
+                settings['Processes'] = 1
+
+        if 'Couplings' in settings:
+            if type(settings['Couplings']) == str and settings['Couplings'].strip().lower() == 'all':
+                settings['Couplings'] = 'all'
+            elif type(settings['Couplings']) == str:
+                settings['Couplings'] = [el.strip() for el in settings['Couplings'].strip('[] ').split(',') if el.strip() != '']
+            elif type(settings['Couplings']) == list:
+                settings['Couplings'] = [str(el) for el in settings['Couplings']]
+            else:
+                loggingInfo("Warning : 'Couplings' setting must be 'all' or a list of couplings. Setting it to 'all'.")
+                settings['Couplings'] = 'all'
+
+            if settings['Couplings'] == []:
+                settings['Couplings'] = 'all'
+
         if 'MoreGroupTheoryInfo' in settings:
             if settings['MoreGroupTheoryInfo'] is True:
                 settings['MoreGroupTheoryInfo'] = 10
@@ -139,6 +185,11 @@ class Inputs():
         parser.add_argument('--Loops', '-l', dest='Loops', action='store', default=default['DefaultLoopLevel'],
                             help='Set the calculation loop order')
 
+        # Couplings whose RGEs are computed
+        parser.add_argument('--Couplings', '-cpl', dest='Couplings', action='store', default=None,
+                            help='Only compute the RGEs of the given couplings or coupling types, e.g. "QuarticTerms, g1"')
+        parser.set_defaults(Couplings=default['Couplings'])
+
         # Gauge invariance check
         parser.add_argument('--CheckGaugeInvariance', '-gi', dest='CheckGaugeInvariance', action='store_true', default=None,
                             help='Perform a gauge invariance check prior to the RGE computation')
@@ -146,6 +197,32 @@ class Inputs():
                             help='Perform a gauge invariance check prior to the RGE computation')
         parser.set_defaults(CheckGaugeInvariance=default['CheckGaugeInvariance'])
 
+        # Parallel computation
+        parser.add_argument('--Processes', '-np', dest='Processes', action='store', default=default['Processes'],
+                            help='Set the number of processes used to compute the RGEs')
+
+        # Cache of the results
+        parser.add_argument('--UseCache', '-cache', dest='UseCache', action='store_true', default=None,
+                            help='Re-use the RGEs previously computed for the same model, if any')
+        parser.add_argument('--no-UseCache', '-no-cache', dest='UseCache', action='store_false', default=None,
+                            help='Do not read nor store the RGEs in the cache')
+        parser.set_defaults(UseCache=default['UseCache'])
+
+        parser.add_argument('--UseSnapshot', '-snap', dest='UseSnapshot', action='store_true', default=None,
+                            help='Re-use the model initialized in a previous run, if any')
+        parser.add_argument('--no-UseSnapshot', '-no-snap', dest='UseSnapshot', action='store_false', default=None,
+                            help='Initialize the model from scratch')
+        parser.set_defaults(UseSnapshot=default['UseSnapshot'])
+
+        parser.add_argument('--Incremental', '-inc', dest='Incremental', action='store_true', default=None,
+                            help='Only re-compute the diagrams affected by the changes in the model since its last run')
+        parser.add_argument('--no-Incremental', '-no-inc', dest='Incremental', action='store_false', default=None,
+                            help='Compute all the diagrams')
+        parser.set_defaults(Incremental=default['Incremental'])
+
+        parser.add_argument('--Resume', '-resume', dest='Resume', action='store_true', default=False,
+                            help='Resume the computation of the RGEs from the last checkpoint')
+
         # Result folder
         parser.add_argument('--Results', '-res', dest='Results', action='store', default=default['ResultsFolder'],
                             help='Store all the output files in the path')
@@ -185,6 +262,10 @@ class Inputs():
                             help='Specify the treatment of real representations. Possible values are : None, adjoint, all.')
         parser.set_defaults(RealBasis=default['RealBasis'])
 
+        parser.add_argument('--ContractionEngine', '-ce', dest='ContractionEngine', action='store', default=None,
+                            help='Specify the algorithm used to evaluate the tensor contractions. Possible values are : pairwise, nested.')
+        parser.set_defaults(ContractionEngine=default['ContractionEngine'])
+
         return parser.parse_args().__dict__
 
 
@@ -537,14 +618,23 @@ VerboseLevel : Info
 ResultsFolder : results/
 LogFolder : log/
 DisableLogFiles : False
+CacheFolder : cache/
 
 # Computation
 
 DefaultLoopLevel : 1
+Couplings : all   #Couplings or coupling types whose RGEs are computed, e.g. [QuarticTerms, g1]
 CheckGaugeInvariance : True
 PrintComputationTimes : True
+Processes : 1   #Number of processes used to compute the RGEs
+UseCache : False   #Re-use the RGEs previously computed for the same model
+CacheSize : 500   #Maximal size of the cache folder, in MB
+UseSnapshot : False   #Re-use the model initialized in a previous run of the same model file
+Incremental : False   #Only re-compute the diagrams affected by the changes since the last run
+CheckpointInterval : 300   #Time between two checkpoints of the RGE computation, in seconds (0 to disable). Only used with UseCache or --Resume
 
 RealBasis : all
+ContractionEngine : pairwise   #Either 'pairwise' or 'nested'
 
 # Output
 
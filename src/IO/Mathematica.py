@@ -41,6 +41,10 @@ class MathematicaExport():
 
         anomalous = (model.scalarAnomalous != {} or model.fermionAnomalous != {})
 
+        # The RGEs cannot be solved if they were only computed for a subset of the couplings
+        self.partial = model.runSettings['Couplings'] != 'all'
+        self.solver = model.runSettings['MathematicaSolver'] is True and not self.partial
+
         self.preamble(model, anomalous)
 
         self.RGEs(model, anomalous)
@@ -48,7 +52,7 @@ class MathematicaExport():
         if anomalous:
             self.anomalous(model)
 
-        if model.runSettings['MathematicaSolver'] is True and model.symbolicGen is False:
+        if self.solver and model.symbolicGen is False:
             self.RGsolver(model)
 
         self.replacements()
@@ -69,7 +73,10 @@ class MathematicaExport():
 (*Model : {model._Name}*)
 (*Author : {model._Author}*)
 (**)"""
-        if model.runSettings['MathematicaSolver'] is True:
+        if self.partial:
+            self.string += """
+(*The RGEs were only computed for a subset of the couplings : the code solving them is not provided.*)\n"""
+        elif self.solver:
             self.string += f"""
 (*Section 1 contains the renormalization group equations""" + (" and the anomalous dimensions of the fields." if anomalous else ".") + """*)
 (*Section 2 is a proposition of a minimal working code to solve the RGEs and plot the running couplings.*)
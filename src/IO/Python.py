@@ -48,6 +48,9 @@ class PythonExport():
         if self.inconsistentRGset:
             raise TypeError("The RGE set is inconsistent. Please refer to the latex output.")
 
+        if model.runSettings['Couplings'] != 'all':
+            raise TypeError("The RGEs were only computed for a subset of the couplings.")
+
         self.gaugeFixing = False
         self.RGfileString = {}
         self.allBetaFunctions = {}
@@ -37,6 +37,9 @@ class UFOExport():
         if self.inconsistentRGset:
             raise TypeError("     -> Error : The RGE set is inconsistent. Please refer to the latex output.")
 
+        if model.runSettings['Couplings'] != 'all':
+            raise TypeError("     -> Error : The RGEs were only computed for a subset of the couplings.")
+
         try:
             self.UFOsubstitutions(model, inconsistentRGEerror=True)
         except TypeError:
@@ -2,7 +2,18 @@
 
 import sys
 import os
+import glob
+import shutil
 import time
+from collections import OrderedDict
+from copy import deepcopy
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No file locking on this platform
+    fcntl = None
 
 wd = os.path.abspath(os.path.dirname(__file__))
 sys.path.append(wd)
@@ -10,7 +21,7 @@ sys.path.append(wd)
 from PyLie import LieAlgebra, CartanMatrix
 from Math import sMat, sTensor
 
-from sympy import Add, Pow, Rational, sqrt, I, Symbol
+from sympy import Add, Mul, Pow, Rational, sqrt, I, Symbol, sympify
 
 import numpy as np
 npStr = np.string_
@@ -22,7 +33,13 @@ class PyLieDB():
     """ This is the main class used to communicate with the Pylie module and
         the associated database. """
 
-    def __init__(self, path=None, logLevel='Info', raiseErrors=False):
+    # Maximal number of objects kept in the in-memory cache of each instance
+    cacheSize = 4096
+
+    # Maximal number of segments of the HDF5 store before they are merged in it
+    maxSegments = 8
+
+    def __init__(self, path=None, logLevel='Info', raiseErrors=False, storage='hdf5'):
         global wd
 
         if path is not None:
@@ -32,6 +49,26 @@ class PyLieDB():
 
         self.tmpPath = self.path.replace('PyLieDB.hd5f.gz', '._PyLieDB.hd5f')
 
+        # Storage mode :
+        #  - 'gzip' : the whole DB is decompressed in a temporary file when
+        #             loaded, and re-compressed when closed if it was modified
+        #  - 'hdf5' : the DB is stored in an uncompressed HDF5 file whose
+        #             datasets are individually compressed. The file is opened
+        #             in place, read-only, by any number of processes. The
+        #             objects computed by a process are written in a journal
+        #             private to the process. When the DB is closed, the
+        #             journal becomes a read-only segment of the store, and
+        #             the segments are merged in the store once they are more
+        #             than 'maxSegments'.
+        if storage not in ('gzip', 'hdf5'):
+            raise ValueError(f"Unknown storage mode '{storage}'")
+        self.storage = storage
+        self.storePath = self.path.replace('PyLieDB.hd5f.gz', 'PyLieDB.h5')
+        self.lockPath = self.storePath + '.lock'
+        self.journal = None
+        self.journalPid = None
+        self.segments = []
+
         self.gzf = None
         self.f = None
         self.modified = False
@@ -39,6 +76,12 @@ class PyLieDB():
 
         self.algebras = {}
 
+        # In-memory cache of the objects read from the DB or computed, keyed
+        # by the normalized requests. The least recently used ones are dropped.
+        self.cache = OrderedDict()
+        self.cacheHits = 0
+        self.cacheMisses = 0
+
         self.logging = {}
         self.initLogging(logLevel)
         self.raiseErrors = raiseErrors
@@ -78,6 +121,11 @@ class PyLieDB():
     def load(self, force=False):
         if self.loaded:
             return
+
+        if self.storage == 'hdf5':
+            self.loadStore()
+            return
+
         busy = os.path.exists(self.tmpPath)
 
         if busy and not force:
@@ -100,6 +148,189 @@ class PyLieDB():
 
         self.loaded = True
 
+    def loadStore(self):
+        """ Opens the HDF5 store and its segments in read-only mode. The store is
+            created from the .gz DB file the first time, and updated when the
+            latter is more recent. The journals left by processes which did not
+            close the DB become segments. """
+
+        with self.storeLock():
+            if not os.path.exists(self.storePath):
+                self.updateStore([self.path] if os.path.exists(self.path) else [])
+            elif os.path.exists(self.path) and os.path.getmtime(self.path) > os.path.getmtime(self.storePath):
+                # The objects of the more recent .gz DB file replace those of
+                # the store and of its segments
+                self.updateStore(self.segmentPaths() + [self.path])
+
+            for journal in self.orphanJournals():
+                self.addSegment(journal)
+
+            # The segments are opened before the lock is released, so that
+            # they are not merged in the meantime
+            self.f = h5py.File(self.storePath, 'r')
+            self.segments = [h5py.File(path, 'r') for path in self.segmentPaths()]
+
+        self.loaded = True
+
+    @contextmanager
+    def storeLock(self):
+        """ Exclusive lock held while the store is being replaced """
+
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.lockPath, 'a') as lockFile:
+            fcntl.flock(lockFile, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+    def orphanJournals(self):
+        """ Journals of the processes which are no longer running """
+
+        orphans = []
+        for path in glob.glob(glob.escape(self.storePath) + '.*.journal'):
+            try:
+                pid = int(path.split('.')[-2])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                orphans.append(path)
+            except OSError:
+                pass
+
+        return orphans
+
+    def journalPath(self):
+        """ Journal of the current process """
+
+        return self.storePath + f'.{os.getpid()}.journal'
+
+    def segmentPaths(self):
+        return sorted(glob.glob(glob.escape(self.storePath) + '.*.segment'))
+
+    def addSegment(self, journal):
+        """ Turns a journal into a segment of the store. The segments are merged
+            in the store (which costs a copy of the whole store) once they are
+            more than 'maxSegments'. The store lock must be held. """
+
+        os.replace(journal, self.storePath + f'.{time.time_ns()}-{os.getpid()}.segment')
+
+        segments = self.segmentPaths()
+        if len(segments) > self.maxSegments:
+            self.updateStore(segments)
+
+    def updateStore(self, sources, migrate=False):
+        """ Atomically replaces the store by a copy containing the objects of
+            the sources (the .gz DB file or segments), which are then removed
+            (except the .gz file). The values imported from the .gz file are
+            converted to the exact encoding. The store lock must be held. """
+
+        tmpPath = self.storePath + f'.{os.getpid()}.tmp'
+        archivePath = self.storePath + f'.{os.getpid()}.archive'
+
+        # When the .gz file is imported in an existing store, the latter is
+        # re-built with the objects of the .gz file taking precedence over
+        # the former ones (the objects are only copied if missing)
+        rebuild = self.path in sources and os.path.exists(self.storePath)
+        if rebuild:
+            sources = [self.path, self.storePath] + [el for el in sources if el != self.path]
+
+        try:
+            if os.path.exists(self.storePath) and not rebuild:
+                shutil.copyfile(self.storePath, tmpPath)
+
+            with h5py.File(tmpPath, 'a') as store:
+                if 'created' not in store.attrs:
+                    store.attrs['created'] = time.ctime()
+                    store.attrs['modified'] = ''
+
+                for source in sources:
+                    self.loggingDebug(f"Merging the content of '{source}' in '{self.storePath}' ...")
+                    if source == self.path:
+                        with gzip.open(self.path, 'rb') as gzFile, \
+                                  open(archivePath, 'wb') as _bFile:
+                            _bFile.writelines(gzFile)
+                        source = archivePath
+                    else:
+                        store.attrs['modified'] = time.ctime()
+
+                    with h5py.File(source, 'r') as f:
+                        copyItems(f, store, replaceMarked=not rebuild)
+
+                if migrate or self.path in sources:
+                    count = migrateValues(store)
+                    self.loggingDebug(f"{count} objects converted to the exact encoding.")
+
+            # Readers which opened the former store keep reading it
+            os.replace(tmpPath, self.storePath)
+        finally:
+            for path in (tmpPath, archivePath):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        for source in sources:
+            if source not in (self.path, self.storePath):
+                os.remove(source)
+
+    def migrate(self):
+        """ Converts the values of the DB stored as strings to the exact encoding """
+
+        if self.loaded:
+            self.close()
+
+        # The DB is first loaded to create / update it if needed
+        self.load()
+        if not self.loaded:
+            return
+
+        if self.storage == 'hdf5':
+            self.close()
+            with self.storeLock():
+                self.updateStore(self.segmentPaths(), migrate=True)
+            return
+
+        if migrateValues(self.f) > 0:
+            self.modified = True
+        self.close()
+
+    def writable(self):
+        """ Returns the HDF5 file in which the new objects must be written. In
+            'hdf5' mode, this is the journal of the process. """
+
+        if self.storage == 'gzip':
+            return self.f
+
+        if self.ownJournal() is None:
+            # A forked process does not write in the journal of its parent
+            self.journal = h5py.File(self.journalPath(), 'a')
+            self.journalPid = os.getpid()
+        return self.journal
+
+    def ownJournal(self):
+        """ The journal of the process, or None """
+
+        if self.journal is not None and self.journalPid == os.getpid():
+            return self.journal
+        return None
+
+    def find(self, *path):
+        """ Returns the object of the DB at the given path, or None """
+
+        name = '/'.join(path)
+        # The most recent objects are looked for first
+        for f in [self.ownJournal()] + self.segments[::-1] + [self.f]:
+            if f is not None and name in f:
+                return f[name]
+
+        return None
+
     def push(self):
         """ Pushes the content of the .hd5f temporary file to the .gz DB file """
 
@@ -107,6 +338,27 @@ class PyLieDB():
         self.load()
 
     def close(self):
+        if self.storage == 'hdf5':
+            for f in [self.f] + self.segments:
+                if f is not None:
+                    f.close()
+            self.segments = []
+
+            if self.ownJournal() is not None:
+                empty = len(self.journal) == 0
+                self.journal.close()
+                if empty:
+                    os.remove(self.journalPath())
+                else:
+                    with self.storeLock():
+                        self.addSegment(self.journalPath())
+            self.journal = None
+
+            self.f = None
+            self.loaded = False
+            self.modified = False
+            return
+
         if self.modified:
             self.f.attrs['modified'] = time.ctime()
             self.f.close()
@@ -131,6 +383,20 @@ class PyLieDB():
             self.loggingCritical("Database is not loaded.")
             return
 
+        self.cache.clear()
+
+        if self.storage == 'hdf5':
+            self.close()
+
+            # Delete the files
+            with self.storeLock():
+                for path in [self.path, self.storePath] + self.segmentPaths():
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            self.load()
+            return
+
         # Remove all items
         self.modified = True
         if self.f is not None:
@@ -170,7 +436,7 @@ class PyLieDB():
         self._s = ''
 
         # Format DB's size on disk
-        size = os.path.getsize(self.tmpPath)
+        size = os.path.getsize(self.f.filename)
         units = ['B', 'kB', 'MB', 'GB']
         unit = 0
         while size//1000 > 0:
@@ -240,8 +506,8 @@ class PyLieDB():
         # Basic info such as dim, rank, cartan matrix, ... is systematically
         # stored in the DB. Not that this info is computationally costly, but
         # this way it is made available to external programs possibly reading the DB
-        if self.loaded and fn not in self.f:
-            self.f.create_group(fn)
+        if self.loaded and self.find(fn) is None:
+            self.writable().create_group(fn)
             self.writeBasicInfo(self.algebras[fn], overWrite=False)
 
         return self.algebras[fn]
@@ -286,7 +552,7 @@ class PyLieDB():
         If overWrite=False, nothing will happen if the object is already in. """
 
         fn = algebra.fn
-        dbAlg = self.f[fn]
+        dbAlg = self.writable().require_group(fn)
         objType = objType.lower()
 
         # If asked, overwrite the item by deleting it first
@@ -309,7 +575,7 @@ class PyLieDB():
 
                 newVal = PyLieDB.convert(val, dataGroup=dbAlg, objName=objType)
                 if newVal is not None:
-                    dbAlg[objType] = newVal
+                    writeDataset(dbAlg, objType, newVal)
                 self.modified = True
             else:
                 self.loggingDebug(f"  In '{fn}' : Object '{objType}' is already here, with value '{PyLieDB.parse(dbAlg[objType])}'")
@@ -331,11 +597,18 @@ class PyLieDB():
             newVal = PyLieDB.convert(objVal, objType=objType, dataGroup=dbAlg[objType], objName=objName)
 
             if newVal is not None:
-                dbAlg[objType][objName] = newVal
+                writeDataset(dbAlg[objType], objName, newVal)
             self.modified = True
 
         else:
             self.loggingCritical(f"Error : unkown object type '{objType}'")
+            return
+
+        # In 'hdf5' mode, the former value may still be in the store or its
+        # segments : the new one is marked to replace it when merged
+        if overWrite and self.storage == 'hdf5':
+            obj = dbAlg[objType] if objName is None else dbAlg[objType][objName]
+            obj.attrs[overwriteMarker] = True
 
 
     def convert(val, objType=None, allStr=False, dataGroup=None, objName=None):
@@ -573,11 +846,6 @@ class PyLieDB():
 
         objType = self.abb(objType)
 
-        # For objects stored in the DB, check that it is loaded
-        # and raise an error otherwise
-        if objType in self.storedTranslations and not self.loaded:
-            raise self.NotLoadedError
-
         algebra = self.loadAlgebra(gp)
 
         formatedInput = self.handleInput(algebra, objType, args, kwargs)
@@ -589,13 +857,87 @@ class PyLieDB():
 
         objName, args, kwargs = formatedInput
 
+        key = self.cacheKey(algebra, objType, objName, args, kwargs)
+        if key is not None:
+            if key in self.cache:
+                self.cacheHits += 1
+                self.cache.move_to_end(key)
+                return PyLieDB.copyResult(self.cache[key])
+            self.cacheMisses += 1
+
+        # For objects stored in the DB, check that it is loaded
+        # and raise an error otherwise
+        if objType in self.storedTranslations and not self.loaded:
+            raise self.NotLoadedError
+
+        ret = self.readOrCompute(algebra, objType, objName, args, kwargs)
+
+        if key is not None and ret is not None and (type(ret) != tuple or ret[0] is not None):
+            self.cache[key] = ret
+            if len(self.cache) > self.cacheSize:
+                self.cache.popitem(last=False)
+
+        return PyLieDB.copyResult(ret)
+
+    def cacheKey(self, algebra, objType, objName, args, kwargs):
+        """ Key of a normalized request in the in-memory cache, or None if the
+            result must not be cached """
+
+        if objType in self.storedTranslations:
+            return (algebra.fn, objType, objName)
+        if objType in self.basicTranslations or objType in ('conjugate', 'repname'):
+            return (algebra.fn, objType, repr(args), repr(sorted(kwargs.items())))
+        return None
+
+    def copyResult(ret):
+        """ The lists returned to the user may be modified : a shallow copy of
+            the cached ones is returned. The invariants themselves are modified
+            in place by get() (fields, ordering) : they are deep-copied. """
+
+        if type(ret) == tuple and isinstance(ret[0], list):
+            if ret[1] == 'invariants':
+                return (deepcopy(ret[0]),) + ret[1:]
+            return (list(ret[0]),) + ret[1:]
+        if isinstance(ret, list):
+            return list(ret)
+        return ret
+
+    def cacheStats(self):
+        return (f"{self.cacheHits} hit{'s' if self.cacheHits != 1 else ''}, "
+                f"{self.cacheMisses} miss{'es' if self.cacheMisses != 1 else ''}")
+
+    def preload(self, requests):
+        """ Reads (or computes) at once the results of a list of requests, to
+            fill the in-memory cache. The requests are given as (args, kwargs),
+            where args and kwargs are the arguments of get(). The invalid
+            requests are ignored here. """
+
+        load = not self.loaded
+        if load:
+            self.load()
+
+        try:
+            for args, kwargs in requests:
+                try:
+                    self.get(*args, **kwargs)
+                except KeyboardInterrupt:
+                    raise
+                except BaseException:
+                    pass
+        finally:
+            if load:
+                self.close()
+
+    def readOrCompute(self, algebra, objType, objName, args, kwargs):
+        """ Reads the result of a normalized request from the DB, or computes it """
+
         if self.isInDB(algebra, objType, objName):
             # Read the object from the DB
             if objType in self.basicTranslations:
                 return self.readBasicInfo(algebra, objType)
             if objName is not None:
-                return PyLieDB.parse(self.f[algebra.fn][objType][objName], objType=objType), objType, algebra
-            return PyLieDB.parse(self.f[algebra.fn][objType])
+                return PyLieDB.parse(self.find(algebra.fn, objType, objName), objType=objType), objType, algebra
+            return PyLieDB.parse(self.find(algebra.fn, objType))
         else:
             # Compute the object
             obj = self.compute(algebra, objType, *args, **kwargs)
@@ -643,15 +985,9 @@ class PyLieDB():
     def isInDB(self, algebra, objType, objName=None):
         if self.loaded is False:
             return False
-        if algebra.fn not in self.f:
-            return False
-        if objType not in self.f[algebra.fn]:
-            return False
         if objName is None:
-            return True
-        if objName not in self.f[algebra.fn][objType]:
-            return False
-        return True
+            return self.find(algebra.fn, objType) is not None
+        return self.find(algebra.fn, objType, objName) is not None
 
 
     ######################
@@ -675,7 +1011,7 @@ class PyLieDB():
         """ Read basic information from the DB. If not already stored in, the info
             will be retrieved and stored via self.loadAlgebra """
 
-        return PyLieDB.parse(self.f[algebra.fn][item])
+        return PyLieDB.parse(self.find(algebra.fn, item))
 
 
     def handleInput(self, algebra, dataType, args, kwargs):
@@ -1092,6 +1428,132 @@ class PyLieDB():
             print(f"{r} : {self.repName(algebra, r)}")
 
 
+# The arrays with at least this number of elements are stored in chunked,
+# compressed datasets
+compressionThreshold = 16
+
+def writeDataset(group, name, value):
+    """ Writes a value in a new dataset of the group """
+
+    arr = np.asarray(value)
+    if arr.ndim > 0 and arr.size >= compressionThreshold and arr.dtype != object:
+        group.create_dataset(name, data=arr, chunks=True, compression='gzip')
+    else:
+        group[name] = value
+
+# Attribute of the objects written with overWrite=True in a journal, which
+# replace the former ones when merged in the store
+overwriteMarker = 'overwrite'
+
+def copyItems(source, dest, replaceMarked=True):
+    """ Recursively copies the groups, datasets and attributes of source
+        missing from dest. The datasets are compressed along. If replaceMarked
+        is True, the objects marked as overwritten replace the ones of dest. """
+
+    for k, v in source.attrs.items():
+        if k not in dest.attrs and k != overwriteMarker:
+            dest.attrs[k] = v
+
+    for name, obj in source.items():
+        if replaceMarked and name in dest and obj.attrs.get(overwriteMarker, False):
+            del dest[name]
+
+        if isinstance(obj, h5py.Group):
+            if name not in dest:
+                dest.create_group(name)
+            copyItems(obj, dest[name], replaceMarked=replaceMarked)
+        elif name not in dest:
+            writeDataset(dest, name, obj[()])
+            for k, v in obj.attrs.items():
+                if k != overwriteMarker:
+                    dest[name].attrs[k] = v
+
+
+# Exact encoding of the numerical values of the sparse matrices / tensors :
+# each value  p/q * sqrt(r) * I^i  is stored as a row (p, q, r, i) of integers
+exactEncoding = 'pqri'
+int64Max = 2**63 - 1
+
+# Interning table of the decoded values
+numberTable = {}
+
+def encodeNumber(val):
+    """ Returns the row (p, q, r, i) encoding an exact number, or None if the
+        number does not have the form p/q * sqrt(r) * I^i """
+
+    coeff, rest = sympify(val).as_coeff_Mul()
+    if not coeff.is_Rational or abs(coeff.p) > int64Max or coeff.q > int64Max:
+        return None
+
+    radicand, imag = 1, 0
+    for el in Mul.make_args(rest):
+        if el == 1:
+            continue
+        if el == I and imag == 0:
+            imag = 1
+        elif (isinstance(el, Pow) and el.exp == Rational(1, 2) and el.base.is_Integer
+              and el.base > 0 and el.base <= int64Max and radicand == 1):
+            radicand = int(el.base)
+        else:
+            return None
+
+    return (int(coeff.p), int(coeff.q), radicand, imag)
+
+def decodeNumber(row):
+    if row not in numberTable:
+        p, q, r, i = row
+        numberTable[row] = Rational(p, q) * sqrt(r) * (I if i else 1)
+
+    return numberTable[row]
+
+def writeValues(group, name, values):
+    """ Writes the values of a sparse matrix / tensor, with the exact encoding
+        if possible. Otherwise, the values are stored as strings. """
+
+    rows = [encodeNumber(v) for v in values]
+
+    if values != [] and all([row is not None for row in rows]):
+        writeDataset(group, name, np.array(rows, dtype=np.int64))
+        group[name].attrs['encoding'] = exactEncoding
+    else:
+        writeDataset(group, name, [PyLieDB.convert(v, allStr=True) for v in values])
+
+def readValues(dataset):
+    """ Reads the values of a sparse matrix / tensor as a list of SymPy numbers """
+
+    if dataset.attrs.get('encoding', '') != exactEncoding:
+        return [PyLieDB.parse(v) for v in dataset[()]]
+
+    # Each distinct value is decoded once
+    rows, inverse = np.unique(dataset[()], axis=0, return_inverse=True)
+    numbers = [decodeNumber(tuple(row)) for row in rows.tolist()]
+
+    return [numbers[i] for i in inverse.ravel().tolist()]
+
+def migrateValues(group):
+    """ Converts the values of the sparse matrices / tensors stored as strings
+        in the group to the exact encoding. Returns the number of converted objects. """
+
+    count = 0
+    for name, obj in group.items():
+        if not isinstance(obj, h5py.Group):
+            continue
+
+        objType = obj.attrs.get('type', '')
+        if (objType[:4] == 'sMat' or objType == 'sTensor') and 'v' in obj:
+            if obj['v'].attrs.get('encoding', '') == exactEncoding:
+                continue
+            values = readValues(obj['v'])
+            if values != [] and all([encodeNumber(v) is not None for v in values]):
+                del obj['v']
+                writeValues(obj, 'v', values)
+                count += 1
+        else:
+            count += migrateValues(obj)
+
+    return count
+
+
 class sMatDB():
     """ This is a class representing a sparseMartrix to write/read from the DB.
     Works for lists of sparse matrices and lists of lists of sparse matrices.
@@ -1108,8 +1570,8 @@ class sMatDB():
         if isinstance(arg, h5py.Group):
             self.depth = int(arg.attrs['type'][4:])
             self.shape = tuple(PyLieDB.parse(arg['s']))
-            self.keys = arg['k']
-            self.values = arg['v']
+            self.keys = [tuple(k) for k in np.asarray(arg['k'][()], dtype=np.int64).tolist()]
+            self.values = readValues(arg['v'])
             return
 
         # Prepare for storing in DB
@@ -1120,7 +1582,7 @@ class sMatDB():
             # Read the sparse matrix
             for k,v in arg._smat.items():
                 self.keys.append(tuple([int(el) for el in k]))
-                self.values.append(PyLieDB.convert(v, allStr=True))
+                self.values.append(v)
 
         if depth == 1:
             self.depth = depth
@@ -1129,7 +1591,7 @@ class sMatDB():
             for i, mat in enumerate(arg):
                 for k,v in mat._smat.items():
                     self.keys.append((i,) + tuple([int(el) for el in k]))
-                    self.values.append(PyLieDB.convert(v, allStr=True))
+                    self.values.append(v)
 
         if depth == 2:
             self.depth = depth
@@ -1139,7 +1601,7 @@ class sMatDB():
                 for j, mat in enumerate(arg):
                     for k,v in mat._smat.items():
                         self.keys.append((i, j) + tuple([int(el) for el in k]))
-                        self.values.append(PyLieDB.convert(v, allStr=True))
+                        self.values.append(v)
 
 
 
@@ -1151,9 +1613,9 @@ class sMatDB():
             dataGroup = dataGroup[objName]
 
         dataGroup.attrs['type'] = 'sMat'+str(self.depth)
-        dataGroup['s'] = self.shape
-        dataGroup['k'] = self.keys
-        dataGroup['v'] = self.values
+        writeDataset(dataGroup, 's', self.shape)
+        writeDataset(dataGroup, 'k', self.keys)
+        writeValues(dataGroup, 'v', self.values)
 
 
     def read(self):
@@ -1161,21 +1623,18 @@ class sMatDB():
 
         if self.depth == 0:
             ret = sMat(*self.shape)
-            for k,v in zip(self.keys, self.values):
-                key = tuple([PyLieDB.parse(el) for el in k])
-                ret[key] = PyLieDB.parse(v)
+            for key, v in zip(self.keys, self.values):
+                ret[key] = v
 
         elif self.depth == 1:
             ret = [sMat(*self.shape[1:]) for _ in range(self.shape[0])]
-            for k,v in zip(self.keys, self.values):
-                key = tuple([PyLieDB.parse(el) for el in k])
-                ret[key[0]][key[1:]] = PyLieDB.parse(v)
+            for key, v in zip(self.keys, self.values):
+                ret[key[0]][key[1:]] = v
 
         elif self.depth == 2:
             ret = [[sMat(*self.shape[2:]) for _ in range(self.shape[1])] for _ in range(self.shape[0])]
-            for k,v in zip(self.keys, self.values):
-                key = tuple([PyLieDB.parse(el) for el in k])
-                ret[key[0]][key[1]][key[2:]] = PyLieDB.parse(v)
+            for key, v in zip(self.keys, self.values):
+                ret[key[0]][key[1]][key[2:]] = v
 
         return ret
 
@@ -1199,27 +1658,27 @@ class sTensorDB():
                 for k,v in el.dic.items():
                     key = tuple([int(i)] + [int(j) for j in k if j is not None])
                     self.keys.append(key)
-                    self.values.append(PyLieDB.convert(v, allStr=True))
+                    self.values.append(v)
 
         if isinstance(arg, h5py.Group):
             self.shape = tuple(PyLieDB.parse(arg['s']))
 
             if len(self.shape) > 0:
-                self.keys = arg['k']
-                self.values = arg['v']
+                self.keys = [tuple(k) for k in np.asarray(arg['k'][()], dtype=np.int64).tolist()]
+                self.values = readValues(arg['v'])
 
     def write(self, dataGroup, objName):
         """ Write the sparse tensors in the dataGroup """
 
         dataGroup.create_group(objName)
         dataGroup[objName].attrs['type'] = 'sTensor'
-        dataGroup[objName]['s'] = self.shape
+        writeDataset(dataGroup[objName], 's', self.shape)
 
         if self.shape == ():
             return
 
-        dataGroup[objName]['k'] = self.keys
-        dataGroup[objName]['v'] = self.values
+        writeDataset(dataGroup[objName], 'k', self.keys)
+        writeValues(dataGroup[objName], 'v', self.values)
 
     def read(self):
         """ Returns the matrix in the form of a proper list of sTensors """
@@ -1228,8 +1687,6 @@ class sTensorDB():
 
         ret = [sTensor(*self.shape[1:]) for _ in range(self.shape[0])]
         for k,v in zip(self.keys, self.values):
-            i = PyLieDB.parse(k[0])
-            key = tuple([PyLieDB.parse(el) for el in k[1:]])
-            ret[i][key] = PyLieDB.parse(v)
+            ret[k[0]][k[1:]] = v
 
         return ret
\ No newline at end of file
@@ -0,0 +1,20 @@
+""" This file is designed to be run from the shell. It converts the values of
+the PyLie DB stored as strings to the exact binary encoding. By default, both the
+HDF5 store and the .gz DB file are converted. Usage :
+    python dbMigrate.py [path to PyLieDB.hd5f.gz] """
+
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from PyLieDB import PyLieDB
+
+path = sys.argv[1] if len(sys.argv) > 1 else None
+
+try:
+    for storage in ('gzip', 'hdf5'):
+        PyLieDB(path=path, storage=storage).migrate()
+except BaseException as e:
+    print("Error during the migration of the DB : " + str(e))
+    sys.exit(1)
@@ -0,0 +1,191 @@
+""" This file is designed to be run from the shell. It starts a long-lived server
+answering the requests sent to the PyLie DB by an external program (such as
+Mathematica in the context of the FeynRules interface). Contrary to dbRequest.py,
+which is launched once per request, the DB is kept open between the requests.
+
+The requests are read on stdin, one JSON object (or list of objects, for a batch
+of requests) per line, e.g.
+    {"id": 1, "group": "SU3", "request": "invariants", "args": [[[1,0],[0,1]]], "kwargs": {"pyrateNormalization": true}}
+For each line, the server writes on stdout one JSON line with the response (or
+list of responses) of the form
+    {"id": 1, "status": 0}
+where the status codes are those of dbRequest.py : 0 (success), 2 (invalid
+request) or 4 (error while reading / computing the object). If "return" is true
+in the request, the string representation of the result is sent in the field
+"result" of the response.
+
+The other commands are :
+    {"command": "flush"} : writes the newly computed objects in the DB
+    {"command": "stats"} : returns the statistics of the cache of the DB
+    {"command": "close"} : closes the DB and stops the server (as does the end of stdin)
+
+The newly computed objects are written in the DB every '--flush-interval'
+seconds (10 by default), including while the server is idle. Usage :
+    python dbServer.py [--flush-interval N]
+"""
+
+import sys
+import os
+import io
+import json
+import select
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from PyLieDB import PyLieDB
+
+
+class DBServer():
+    def __init__(self, db, flushInterval):
+        self.db = db
+        self.flushInterval = flushInterval
+        self.lastFlush = time.time()
+
+    def flush(self):
+        """ Writes the newly computed objects in the DB, which is then re-opened """
+
+        self.db.push()
+        self.lastFlush = time.time()
+
+    def pending(self):
+        return self.db.modified or self.db.journal is not None
+
+    def flushTimeout(self):
+        """ Time left before the next periodic flush, or None if there is
+            nothing to flush """
+
+        if not self.pending():
+            return None
+        return max(0, self.lastFlush + self.flushInterval - time.time())
+
+    def lines(self, inStream):
+        """ Yields the lines of the input stream. None is yielded whenever the
+            flush interval elapses without any input. """
+
+        try:
+            fd = inStream.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            yield from inStream
+            return
+
+        buffer = b''
+        while True:
+            ready, _, _ = select.select([fd], [], [], self.flushTimeout())
+            if ready == []:
+                yield None
+                continue
+
+            data = os.read(fd, 65536)
+            if data == b'':
+                if buffer != b'':
+                    yield buffer.decode()
+                return
+
+            *lines, buffer = (buffer + data).split(b'\n')
+            for line in lines:
+                yield line.decode()
+
+    def handle(self, request):
+        """ Returns the response to a single request """
+
+        if not isinstance(request, dict):
+            return {'status': 2, 'error': 'The request must be a JSON object.'}
+
+        response = {}
+        if 'id' in request:
+            response['id'] = request['id']
+
+        if 'command' in request:
+            if request['command'] == 'flush':
+                self.flush()
+            elif request['command'] == 'stats':
+                response['result'] = self.db.cacheStats()
+            elif request['command'] != 'close':
+                response.update({'status': 2, 'error': f"Unknown command '{request['command']}'."})
+                return response
+            response['status'] = 0
+            return response
+
+        try:
+            gp, objType = request['group'], request['request']
+            args = request.get('args', [])
+            kwargs = request.get('kwargs', {})
+            if not isinstance(args, list) or not isinstance(kwargs, dict):
+                raise TypeError
+        except (KeyError, TypeError):
+            response.update({'status': 2, 'error': "Invalid request."})
+            return response
+
+        try:
+            result = self.db.get(gp, objType, *args, **kwargs)
+        except KeyboardInterrupt:
+            raise
+        except BaseException as e:
+            response.update({'status': 4, 'error': str(e)})
+            return response
+
+        if result is None:
+            response['status'] = 4
+            return response
+
+        response['status'] = 0
+        if request.get('return', False):
+            response['result'] = str(result)
+
+        return response
+
+    def run(self, inStream, outStream):
+        """ Answers the requests until the end of the input stream, or until
+            the 'close' command is received """
+
+        for line in self.lines(inStream):
+            if line is None or line.strip() == '':
+                self.periodicFlush()
+                continue
+
+            try:
+                requests = json.loads(line)
+            except ValueError as e:
+                responses, requests = {'status': 2, 'error': str(e)}, []
+            else:
+                # The messages printed by PyLie must not mix with the responses
+                with redirect_stdout(sys.stderr):
+                    if isinstance(requests, list):
+                        responses = [self.handle(request) for request in requests]
+                    else:
+                        responses = self.handle(requests)
+                        requests = [requests]
+
+            outStream.write(json.dumps(responses) + '\n')
+            outStream.flush()
+
+            if any([isinstance(r, dict) and r.get('command') == 'close' for r in requests]):
+                break
+
+            self.periodicFlush()
+
+    def periodicFlush(self):
+        if self.pending() and time.time() - self.lastFlush >= self.flushInterval:
+            with redirect_stdout(sys.stderr):
+                self.flush()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Server answering the requests sent to the PyLie DB")
+    parser.add_argument('--flush-interval', dest='flushInterval', type=float, default=10,
+                        help="Interval (in seconds) between two writes of the newly computed objects in the DB")
+    flushInterval = parser.parse_args().flushInterval
+
+    try:
+        db = PyLieDB(logLevel='Critical', raiseErrors=True)
+        db.load(force=True)
+    except BaseException:
+        sys.exit(3)
+
+    try:
+        DBServer(db, flushInterval).run(sys.stdin, sys.stdout)
+    finally:
+        db.close()